@@ -1,14 +1,14 @@
 import os
+from pathlib import Path
 
 # Base directories
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = os.path.join(BASE_DIR, "data")
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 
 # Create directories if they don't exist
-for directory in [DATA_DIR, LOG_DIR]:
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+for directory in (DATA_DIR, LOG_DIR):
+    os.makedirs(directory, exist_ok=True)
 
 # Configuration dictionary
 CONFIG = {
@@ -18,13 +18,15 @@ CONFIG = {
         "timeout": 30,  # seconds
         "max_retries": 3,
         "retry_delay": 5,  # seconds
+        "max_concurrent_requests": 64,  # per-host cap for the async extractor
     },
 
     # Pipeline settings
     "pipeline": {
         "duration_hours": 24,
         "interval_minutes": 60,
-        "output_format": "csv",
+        "utilization_flush_every": 6,  # extractions buffered before appending to CSV
+        "output_format": "csv",  # "parquet" appends utilization to an hourly-partitioned dataset
     },
 
     # CSV settings
@@ -1,108 +1,226 @@
 
+import asyncio
 import logging
-import time
-from datetime import datetime, timedelta
+import os
+import signal
+from datetime import datetime
 
-from extract import extract_charging_stations
-from transform import transform_stations_data, transform_utilization_data, aggregate_hourly_utilization
-from load import save_to_csv
-from data_validation import validate_and_log_data
+import aiohttp
+import pandas as pd
+
+from extract import extract_charging_stations_async
+from transform import flatten_connectors, transform_stations_data, transform_utilization_data, aggregate_hourly_utilization
+from load import save_to_csv, save_to_parquet
+from data_validation import validate_and_log_data_async
+from config import CONFIG
 
 logger = logging.getLogger(__name__)
 
 
-def run_continuous_extraction(duration_hours=24, interval_minutes=60, output_dir="data"):
-    logger.info(f"Starting continuous extraction for {duration_hours} hours "
-                f"with {interval_minutes} minute intervals")
+def _transform_extraction(stations_data, current_time):
+    # Transform data, flattening the connectors once for both transforms
+    connectors_df = flatten_connectors(stations_data)
+    stations_df = transform_stations_data(stations_data, connectors_df)
+    utilization_df = transform_utilization_data(stations_data, current_time, connectors_df)
 
-    # Calculate end time
-    end_time = datetime.now() + timedelta(hours=duration_hours)
+    # Aggregate hourly data
+    hourly_df = aggregate_hourly_utilization(utilization_df)
 
-    # Initialize statistics
-    stats = {
-        'extraction_count': 0,
-        'total_stations': 0,
-        'total_utilization_records': 0,
-        'validation_issues': 0,
-        'errors': 0
-    }
-
-    try:
-        while datetime.now() < end_time:
-            current_time = datetime.now()
-            logger.info(f"Extraction #{stats['extraction_count'] + 1} at {current_time.isoformat()}")
+    return stations_df, utilization_df, hourly_df
 
-            # Extract data
-            stations_data = extract_charging_stations()
 
-            if not stations_data:
-                logger.error("Extraction failed, will retry in the next interval")
-                stats['errors'] += 1
+def _write_utilization(frames, filename, output_dir):
+    # Append all buffered utilization frames in a single write
+    if not frames:
+        return
 
-                # Calculate wait time until the next interval
-                elapsed_seconds = (datetime.now() - current_time).total_seconds()
-                wait_seconds = max(0, interval_minutes * 60 - elapsed_seconds)
+    utilization_df = pd.concat(frames, ignore_index=True)
+    if CONFIG['pipeline']['output_format'] == 'parquet':
+        save_to_parquet(utilization_df, os.path.splitext(filename)[0], output_dir)
+    else:
+        save_to_csv(utilization_df, filename, output_dir, append=True)
 
-                if wait_seconds > 0 and datetime.now() + timedelta(seconds=wait_seconds) < end_time:
-                    logger.info(f"Waiting {wait_seconds:.1f} seconds until the next extraction...")
-                    time.sleep(wait_seconds)
 
-                continue
+def _flush_utilization_buffer(utilization_buffer, filename, output_dir):
+    _write_utilization(utilization_buffer, filename, output_dir)
+    utilization_buffer.clear()
 
-            # Transform data
-            stations_df = transform_stations_data(stations_data)
-            utilization_df = transform_utilization_data(stations_data, current_time)
 
-            # Aggregate hourly data
-            hourly_df = aggregate_hourly_utilization(utilization_df)
+async def _flush_utilization_buffer_async(utilization_buffer, filename, output_dir):
+    # The frames are taken out of the buffer before the write runs in a worker thread, so a
+    # cancelled flush still completes in the background without being written twice.
+    # They go back into the buffer if the write fails.
+    frames = utilization_buffer[:]
+    utilization_buffer.clear()
+    try:
+        await asyncio.to_thread(_write_utilization, frames, filename, output_dir)
+    except Exception:
+        utilization_buffer[:0] = frames
+        raise
 
-            # Validate data quality
-            is_valid = validate_and_log_data(stations_df, utilization_df, hourly_df)
 
-            # Update statistics and track validation results
-            stats['extraction_count'] += 1
-            stats['total_stations'] = len(stations_df)
-            stats['total_utilization_records'] += len(utilization_df)
-            if not is_valid:
-                stats['validation_issues'] = stats.get('validation_issues', 0) + 1
-                logger.warning("Data validation found issues in extraction #%d", stats['extraction_count'])
+def _log_summary(stats):
+    # Log summary statistics
+    logger.info("Continuous extraction complete. Summary statistics:")
+    logger.info("Total extractions: %d", stats['extraction_count'])
+    logger.info("Total stations in last extraction: %d", stats['total_stations'])
+    logger.info("Total utilization records collected: %d", stats['total_utilization_records'])
+    logger.info("Extractions with validation issues: %d", stats['validation_issues'])
+    logger.info("Total errors: %d", stats['errors'])
+
+
+async def _wait_for_next_interval(stop_event, iteration_start, interval_seconds, deadline):
+    # Scheduling uses the event loop's monotonic clock, so wall-clock jumps (NTP, DST)
+    # cannot stretch or skip intervals. Wakes early if a shutdown was requested.
+    # Returns False when the run should stop: the next extraction would start at or
+    # after the deadline, or a shutdown was requested while waiting.
+    loop = asyncio.get_running_loop()
+    next_time = iteration_start + interval_seconds
+    if next_time >= deadline:
+        return False
+
+    wait_seconds = next_time - loop.time()
+    if wait_seconds > 0:
+        logger.info("Waiting %.1f seconds until the next extraction...", wait_seconds)
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=wait_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    return not stop_event.is_set()
+
+
+async def run_continuous_extraction(duration_hours=24, interval_minutes=60, output_dir="data", stop_event=None,
+                                    flush_every=None):
+    if stop_event is None:
+        stop_event = asyncio.Event()
+
+    if flush_every is None:
+        flush_every = CONFIG['pipeline']['utilization_flush_every']
+
+    # Let SIGTERM stop the run cleanly between extractions
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, stop_event.set)
+    except (NotImplementedError, RuntimeError):
+        pass
 
-            # Quality checks
-            available_count = utilization_df['is_available'].sum() if not utilization_df.empty else 0
-            occupied_count = utilization_df['is_occupied'].sum() if not utilization_df.empty else 0
-            out_of_order_count = utilization_df['is_out_of_order'].sum() if not utilization_df.empty else 0
+    logger.info("Starting continuous extraction for %s hours with %s minute intervals",
+                duration_hours, interval_minutes)
 
-            logger.info(f"Current status: {available_count} available, "
-                        f"{occupied_count} occupied, {out_of_order_count} out of order")
+    # Calculate end time on the monotonic loop clock
+    interval_seconds = interval_minutes * 60
+    deadline = loop.time() + duration_hours * 3600
 
-            # Save stations data
-            stations_filename = f"charging_stations.csv"
-            save_to_csv(stations_df, stations_filename, output_dir)
+    # Initialize statistics
+    stats = {
+        'extraction_count': 0,
+        'total_stations': 0,
+        'total_utilization_records': 0,
+        'validation_issues': 0,
+        'errors': 0
+    }
 
-            # Save utilization data
-            utilization_filename = f"utilization_data.csv"
-            save_to_csv(utilization_df, utilization_filename, output_dir, append=True)
+    # Utilization frames are buffered and appended to disk every flush_every extractions
+    utilization_filename = "utilization_data.csv"
+    utilization_buffer = []
 
-            # Calculate wait time until the next interval
-            elapsed_seconds = (datetime.now() - current_time).total_seconds()
-            wait_seconds = max(0, interval_minutes * 60 - elapsed_seconds)
+    timeout = aiohttp.ClientTimeout(total=CONFIG['api']['timeout'])
 
-            if wait_seconds > 0 and datetime.now() + timedelta(seconds=wait_seconds) < end_time:
-                logger.info(f"Waiting {wait_seconds:.1f} seconds until the next extraction...")
-                time.sleep(wait_seconds)
+    try:
+        # One session for the whole run so connections are reused between extractions
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            while loop.time() < deadline and not stop_event.is_set():
+                iteration_start = loop.time()
+                current_time = datetime.now()
+                logger.info("Extraction #%d at %s", stats['extraction_count'] + 1, current_time.isoformat())
+
+                # Extract data
+                stations_data = await extract_charging_stations_async(
+                    session,
+                    url=CONFIG['api']['url'],
+                    max_retries=CONFIG['api']['max_retries'],
+                    retry_delay=CONFIG['api']['retry_delay'],
+                )
+
+                if not stations_data:
+                    logger.error("Extraction failed, will retry in the next interval")
+                    stats['errors'] += 1
+
+                    # Wait until the next interval
+                    if not await _wait_for_next_interval(stop_event, iteration_start, interval_seconds, deadline):
+                        break
+
+                    continue
+
+                # Transform and aggregate in a worker thread so the event loop stays responsive
+                stations_df, utilization_df, hourly_df = await asyncio.to_thread(
+                    _transform_extraction, stations_data, current_time)
+
+                # Validate data quality
+                is_valid = await validate_and_log_data_async(stations_df, utilization_df, hourly_df)
+
+                # Update statistics and track validation results
+                stats['extraction_count'] += 1
+                stats['total_stations'] = len(stations_df)
+                stats['total_utilization_records'] += len(utilization_df)
+                if not is_valid:
+                    stats['validation_issues'] = stats.get('validation_issues', 0) + 1
+                    logger.warning("Data validation found issues in extraction #%d", stats['extraction_count'])
+
+                # Quality checks
+                if not utilization_df.empty:
+                    status_sums = utilization_df[['is_available', 'is_occupied', 'is_out_of_order']].sum(axis=0)
+                    available_count, occupied_count, out_of_order_count = status_sums.astype(int)
+                else:
+                    available_count = occupied_count = out_of_order_count = 0
+
+                logger.info("Current status: %d available, %d occupied, %d out of order",
+                            available_count, occupied_count, out_of_order_count)
+
+                # Save stations data
+                stations_filename = f"charging_stations.csv"
+                await asyncio.to_thread(save_to_csv, stations_df, stations_filename, output_dir)
+
+                # Buffer utilization data, flushing every flush_every extractions
+                if not utilization_df.empty:
+                    utilization_buffer.append(utilization_df)
+                if stats['extraction_count'] % flush_every == 0:
+                    await _flush_utilization_buffer_async(utilization_buffer, utilization_filename, output_dir)
+
+                # Wait until the next interval
+                if not await _wait_for_next_interval(stop_event, iteration_start, interval_seconds, deadline):
+                    break
 
     except KeyboardInterrupt:
         logger.info("Continuous extraction interrupted by user")
+    except asyncio.CancelledError:
+        # Clean up below, then let the cancellation reach the caller
+        logger.info("Continuous extraction cancelled")
+        raise
     except Exception as e:
-        logger.exception(f"Continuous extraction failed: {str(e)}")
+        logger.exception("Continuous extraction failed: %s", e)
         stats['errors'] += 1
-
-    # Log summary statistics
-    logger.info(f"Continuous extraction complete. Summary statistics:")
-    logger.info(f"Total extractions: {stats['extraction_count']}")
-    logger.info(f"Total stations in last extraction: {stats['total_stations']}")
-    logger.info(f"Total utilization records collected: {stats['total_utilization_records']}")
-    logger.info(f"Extractions with validation issues: {stats['validation_issues']}")
-    logger.info(f"Total errors: {stats['errors']}")
-
-    return stats
\ No newline at end of file
+    finally:
+        # Never lose buffered records, even on interruption; a failed flush must not
+        # mask the original error or skip the summary below. This last flush runs
+        # inline, as the loop may already be shutting down.
+        try:
+            _flush_utilization_buffer(utilization_buffer, utilization_filename, output_dir)
+        except Exception:
+            logger.exception("Failed to flush %d buffered utilization frames", len(utilization_buffer))
+            stats['errors'] += 1
+
+        _log_summary(stats)
+
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(run_continuous_extraction(
+        duration_hours=CONFIG['pipeline']['duration_hours'],
+        interval_minutes=CONFIG['pipeline']['interval_minutes'],
+        output_dir=CONFIG['csv']['output_dir'],
+    ))
@@ -1,94 +1,218 @@
+import asyncio
+import aiohttp
 import requests
 import logging
 import time
+from contextlib import nullcontext
+from functools import lru_cache
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson parses the stations payload several times faster than the stdlib; fall back if absent
+try:
+    import orjson
+
+    def _json_loads(raw):
+        return orjson.loads(raw)
+
+    def _json_dumps_indented(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+
+    def _json_loads(raw):
+        return json.loads(raw)
+
+    def _json_dumps_indented(data):
+        return json.dumps(data, indent=2).encode()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Event loop time before which no further request may go to each URL, set from rate-limit headers
+_RATE_LIMITED_UNTIL = {}
+
+
+class _LoggingRetry(Retry):
+    # urllib3 retries silently; log every retried attempt as the manual retry loop did
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        new_retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        attempt = len(new_retry.history)
+        reason = error if error is not None else f"HTTP {response.status}"
+        logger.warning("Request error on attempt %d/%d: %s. Retrying in %.1f seconds...",
+                       attempt, attempt + new_retry.total + 1, reason, new_retry.get_backoff_time())
+        return new_retry
+
+
+@lru_cache(maxsize=None)
+def _get_session(max_retries, retry_delay):
+    # One keep-alive session per retry configuration, reused across extractions.
+    # urllib3 handles retries with exponential backoff on connection errors and these statuses.
+    retry = _LoggingRetry(total=max_retries, backoff_factor=retry_delay,
+                  status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _rate_limit_delay(headers):
+    # Seconds to hold off before the next request, from standard rate-limit headers
+    retry_after = headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            return 0.0
+
+    if headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            reset = float(headers.get("X-RateLimit-Reset"))
+        except (TypeError, ValueError):
+            return 0.0
+        # Reset is either an epoch timestamp or a number of seconds
+        return max(0.0, reset - time.time()) if reset > 1e9 else max(0.0, reset)
+
+    return 0.0
+
+
+def _process_stations_response(data):
+
+    logger.info("Response data type: %s", type(data))
+
+    if isinstance(data, dict) and "chargingStations" in data:
+        # The API returns a dictionary with a "chargingStations" key containing the list
+        stations_list = data["chargingStations"]
+        logger.info("Extracted %d stations from 'chargingStations' key", len(stations_list))
+    elif isinstance(data, list):
+        # The API returns a list directly
+        stations_list = data
+        logger.info("Extracted %d stations from list response", len(stations_list))
+    else:
+        logger.error("Unexpected data format: %s", type(data))
+
+        # save the response for debugging; the payload can be several MB, so only when debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                Path('api_response_debug.json').write_bytes(_json_dumps_indented(data))
+                logger.debug("Saved API response to 'api_response_debug.json' for debugging")
+            except Exception as e:
+                logger.error("Could not save debug file: %s", e)
+
+        return None
+
+    # Process stations data to handle the "connectionsTypes" field
+    processed_stations = []
+    for station in stations_list:
+        # Standardize field names
+        if "connectionsTypes" in station and "connectionTypes" not in station:
+            station["connectionTypes"] = station.pop("connectionsTypes")
+
+        # Process connector information
+        if "connectionTypes" in station:
+            connectors = []
+            for conn_type, conn_list in station["connectionTypes"].items():
+                for connector in conn_list:
+                    # Add the connector type to each connector
+                    connector["type"] = conn_type
+                    connectors.append(connector)
+
+            # Add the processed connectors list
+            station["connectors"] = connectors
+
+        processed_stations.append(station)
+
+    logger.info("Successfully processed %d stations", len(processed_stations))
+    return processed_stations
+
 
 def extract_charging_stations(url="https://charging.eviny.no/api/map/chargingStations",
                               max_retries=3, retry_delay=5):
 
-    logger.info(f"Extracting charging stations data from {url}")
+    logger.info("Extracting charging stations data from %s", url)
 
-    for attempt in range(max_retries + 1):
-        try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
-            # Parse the JSON response
-            data = response.json()
-
-            logger.info(f"Response data type: {type(data)}")
-
-            if isinstance(data, dict) and "chargingStations" in data:
-                # The API returns a dictionary with a "chargingStations" key containing the list
-                stations_list = data["chargingStations"]
-                logger.info(f"Extracted {len(stations_list)} stations from 'chargingStations' key")
-            elif isinstance(data, list):
-                # The API returns a list directly
-                stations_list = data
-                logger.info(f"Extracted {len(stations_list)} stations from list response")
-            else:
-                logger.error(f"Unexpected data format: {type(data)}")
+    try:
+        response = _get_session(max_retries, retry_delay).get(url, timeout=30)
+        response.raise_for_status()
 
-                # save the response for debugging
-                try:
-                    import json
-                    with open('api_response_debug.json', 'w') as f:
-                        json.dump(data, f, indent=2)
-                    logger.info("Saved API response to 'api_response_debug.json' for debugging")
-                except Exception as e:
-                    logger.error(f"Could not save debug file: {e}")
+        # Parse the JSON response
+        data = _json_loads(response.content)
 
-                return None
+        return _process_stations_response(data)
+
+    except requests.exceptions.RequestException as e:
+        logger.error("Request error (up to %d retries attempted): %s", max_retries, e)
+        logger.error("Extraction failed.")
+        return None
 
-            # Process stations data to handle the "connectionsTypes" field
-            processed_stations = []
-            for station in stations_list:
-                # Standardize field names
-                if "connectionsTypes" in station and "connectionTypes" not in station:
-                    station["connectionTypes"] = station.pop("connectionsTypes")
+    except ValueError as e:
+        logger.error("Error parsing JSON response: %s", e)
+        return None
 
-                # Process connector information
-                if "connectionTypes" in station:
-                    connectors = []
-                    for conn_type, conn_list in station["connectionTypes"].items():
-                        for connector in conn_list:
-                            # Add the connector type to each connector
-                            connector["type"] = conn_type
-                            connectors.append(connector)
+    except Exception as e:
+        logger.error("Unexpected error during extraction: %s", e)
+        return None
 
-                    # Add the processed connectors list
-                    station["connectors"] = connectors
 
-                processed_stations.append(station)
+async def extract_charging_stations_async(session, url="https://charging.eviny.no/api/map/chargingStations",
+                                          max_retries=3, retry_delay=5, semaphore=None):
 
-            logger.info(f"Successfully processed {len(processed_stations)} stations")
-            return processed_stations
+    # Same contract as extract_charging_stations, but reuses the caller's aiohttp
+    # session so keep-alive connections survive between extractions. An optional
+    # semaphore bounds concurrent requests when several extractions share a session.
+    logger.info("Extracting charging stations data from %s", url)
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request error on attempt {attempt + 1}/{max_retries + 1}: {e}")
+    if semaphore is None:
+        semaphore = nullcontext()
+
+    loop = asyncio.get_running_loop()
+
+    for attempt in range(max_retries + 1):
+        # Honour a hold-off the API requested on an earlier response before sending this request
+        wait_seconds = _RATE_LIMITED_UNTIL.get(url, 0.0) - loop.time()
+        if wait_seconds > 0:
+            logger.info("Rate limit reached, holding off %.1f seconds", wait_seconds)
+            await asyncio.sleep(wait_seconds)
+
+        try:
+            async with semaphore:
+                async with session.get(url) as response:
+                    hold_off = _rate_limit_delay(response.headers)
+                    if hold_off > 0:
+                        _RATE_LIMITED_UNTIL[url] = loop.time() + hold_off
+                    response.raise_for_status()
+
+                    # Parse the JSON response regardless of the declared content type
+                    data = _json_loads(await response.read())
+
+            # The data is processed right away; any hold-off delays the next request instead
+            return _process_stations_response(data)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("Request error on attempt %d/%d: %s", attempt + 1, max_retries + 1, e)
 
             if attempt < max_retries:
-                logger.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
+                # A rate-limit hold-off longer than this is waited out at the top of the next attempt
+                logger.info("Retrying in %s seconds...", retry_delay)
+                await asyncio.sleep(retry_delay)
             else:
                 logger.error("Max retries exceeded. Extraction failed.")
                 return None
 
         except ValueError as e:
-            logger.error(f"Error parsing JSON response: {e}")
+            logger.error("Error parsing JSON response: %s", e)
             return None
 
         except Exception as e:
-            logger.error(f"Unexpected error during extraction: {e}")
+            logger.error("Unexpected error during extraction: %s", e)
             return None
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
     # Test the extraction function directly
     stations = extract_charging_stations()
 
@@ -103,4 +227,4 @@ if __name__ == "__main__":
             if connectors:
                 print(f"First connector: {connectors[0]}")
     else:
-        print("Extraction failed")
\ No newline at end of file
+        print("Extraction failed")
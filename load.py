@@ -1,16 +1,144 @@
 import os
+import time
 import logging
 import pandas as pd
 
-# Configure logging
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+# pyarrow backs the partitioned Parquet output and the fast CSV writer; both fall back without it
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as pa_ds
+except ImportError:
+    pa = None
+
 logger = logging.getLogger(__name__)
 
+# Write CSVs through a 1 MB buffer so chunked output becomes few large write() calls
+_CSV_BUFFER_SIZE = 1 << 20
+
+# Timestamps are written the way pyarrow writes microsecond timestamps, whichever writer runs
+_CSV_DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+# Rows parsed per read_csv chunk when loading history, and the compact dtypes applied to utilization;
+# the flags are nullable so a row with an empty flag still loads
+_READ_CHUNK_ROWS = 100_000
+_UTILIZATION_DTYPES = {
+    'is_occupied': 'Int8',
+    'is_available': 'Int8',
+    'is_out_of_order': 'Int8',
+    'connector_type': 'category',
+    'status': 'category',
+}
+
+
+def _to_arrow_table(df):
+    # Arrow table for pyarrow's CSV writer, or None when the frame cannot be written that way
+    if pa is None:
+        return None
+
+    # Nested values (e.g. dict tariff definitions) have no CSV representation in pyarrow, so
+    # those columns are written as their string form, as to_csv does, and every batch of a
+    # history file goes through the same writer
+    columns = {}
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        try:
+            flat = not pa.types.is_nested(pa.array(df[col], from_pandas=True).type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            flat = False
+        if not flat:
+            columns[col] = df[col].astype(str).where(df[col].notna())
+
+    try:
+        table = pa.Table.from_pandas(df.assign(**columns), preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+
+    # Timestamps at microsecond resolution always, matching _CSV_DATE_FORMAT in the to_csv fallback
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type) and field.type.unit != 'us':
+            table = table.set_column(i, field.name, table.column(i).cast(pa.timestamp('us', field.type.tz)))
+
+    return table
+
+
+def _write_csv(df, file_path, mode='w', header=True):
+    # pyarrow's multi-threaded C++ writer when the frame converts, pandas otherwise
+    table = _to_arrow_table(df)
+    if table is not None:
+        with open(file_path, mode + 'b', buffering=_CSV_BUFFER_SIZE) as fh:
+            pa_csv.write_csv(table, fh, pa_csv.WriteOptions(include_header=header, quoting_style='needed'))
+        return
+
+    with open(file_path, mode, buffering=_CSV_BUFFER_SIZE, encoding='utf-8', newline='') as fh:
+        df.to_csv(fh, index=False, header=header, date_format=_CSV_DATE_FORMAT)
+
+
+def _read_csv_chunked(file_path, date_columns=(), dtypes=None):
+    # Parse in bounded chunks with date parsing and compact dtypes applied per chunk, so the
+    # wide object columns of a default parse only ever exist for one chunk at a time
+    header = pd.read_csv(file_path, nrows=0).columns
+    dtypes = {col: dtype for col, dtype in (dtypes or {}).items() if col in header}
+    chunks = pd.read_csv(file_path, chunksize=_READ_CHUNK_ROWS,
+                         parse_dates=[col for col in date_columns if col in header], date_format='ISO8601',
+                         dtype=dtypes)
+    with chunks:
+        df = pd.concat(chunks, ignore_index=True)
+
+    # Chunks infer their own categories, which concat widens when they differ; restore a single categorical
+    for col, dtype in dtypes.items():
+        if dtype == 'category' and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    return df
+
+
+def _dedup(df, keys, keep="last"):
+    # A single key is deduplicated on its Series, skipping the multi-column hashing
+    # DataFrame.drop_duplicates does even for one column
+    if len(keys) == 1:
+        return df.loc[~df[keys[0]].duplicated(keep=keep)]
+    return df.drop_duplicates(subset=keys, keep=keep)
+
+
+def _drop_duplicate_keys(df, keys):
+    # Appended files may repeat a key; the last record wins, as it did on merge
+    if not set(keys).issubset(df.columns):
+        return df
+    return _dedup(df, keys).reset_index(drop=True)
+
+
+def _dedup_keys(filename, columns):
+    # Columns identifying a record in each output file, when the frame has them
+    name = filename.lower()
+    if "stations" in name:
+        keys = ["id"]
+    elif "utilization" in name:
+        keys = ["timestamp", "connector_id"]
+    elif "hourly" in name:
+        keys = ["hourly_timestamp", "station_id"]
+    else:
+        return None
+
+    return keys if set(keys).issubset(columns) else None
+
+
+def _key_index(df, keys):
+    if len(keys) == 1:
+        return pd.Index(df[keys[0]])
+    return pd.MultiIndex.from_frame(df[keys])
+
+
+def _existing_keys(file_path, keys):
+    existing = pd.read_csv(file_path, usecols=keys, parse_dates=[key for key in keys if key.endswith("timestamp")],
+                           date_format='ISO8601')
+    return _key_index(existing, keys)
+
 
 def save_to_csv(df, filename, output_dir="data", append=False):
     if df is None or df.empty:
-        logger.warning(f"No data to save to {filename}")
+        logger.warning("No data to save to %s", filename)
         return None
 
     # Create output directory if it doesn't exist
@@ -21,44 +149,98 @@ def save_to_csv(df, filename, output_dir="data", append=False):
 
     if append and os.path.exists(file_path):
         try:
-            # Load existing data
-            existing_df = pd.read_csv(file_path)
+            keys = _dedup_keys(filename, df.columns)
+            if keys:
+                df = _dedup(df, keys)
 
-            # Combine with new data
-            combined_df = pd.concat([existing_df, df], ignore_index=True)
+            existing_columns = pd.read_csv(file_path, nrows=0).columns
+
+            # Time-series files are appended in place, skipping records the file already holds;
+            # only the key columns of the existing file are read
+            if "stations" not in filename.lower() and set(existing_columns) == set(df.columns):
+                if keys:
+                    df = df[~_key_index(df, keys).isin(_existing_keys(file_path, keys))]
+                _write_csv(df[existing_columns], file_path, mode='a', header=False)
+                logger.info("Appended %d records to %s", len(df), file_path)
+                return file_path
 
-            # Remove duplicates
-            if "stations" in filename.lower():
-                if "id" in combined_df.columns:
-                    combined_df.drop_duplicates(subset=["id"], keep="last", inplace=True)
+            # When df replaces every existing record (the API returns all stations on each call),
+            # checked from the key columns alone, the merge is skipped and the file overwritten
+            if keys and set(keys).issubset(existing_columns) and \
+                    _existing_keys(file_path, keys).isin(_key_index(df, keys)).all():
+                _write_csv(df, file_path)
+                logger.info("Replaced all records in %s with %d records", file_path, len(df))
+                return file_path
 
-            # For utilization data, use timestamp and connector_id
-            elif "utilization" in filename.lower():
-                if "timestamp" in combined_df.columns and "connector_id" in combined_df.columns:
-                    combined_df.drop_duplicates(subset=["timestamp", "connector_id"], keep="last", inplace=True)
+            # Load existing data, dropping the records that df replaces (the new record wins)
+            existing_df = pd.read_csv(file_path)
+            if keys and set(keys).issubset(existing_df.columns):
+                existing_df = existing_df[~_key_index(existing_df, keys).isin(_key_index(df, keys))]
 
-            # For hourly data, use hourly_timestamp and station_id
-            elif "hourly" in filename.lower():
-                if "hourly_timestamp" in combined_df.columns and "station_id" in combined_df.columns:
-                    combined_df.drop_duplicates(subset=["hourly_timestamp", "station_id"], keep="last", inplace=True)
+            # Combine with new data
+            combined_df = pd.concat([existing_df, df], ignore_index=True)
 
             # Save the combined data
-            combined_df.to_csv(file_path, index=False)
-            logger.info(f"Appended {len(df)} records to {file_path}, total {len(combined_df)} records")
+            _write_csv(combined_df, file_path)
+            logger.info("Appended %d records to %s, total %d records", len(df), file_path, len(combined_df))
 
             return file_path
 
         except Exception as e:
-            logger.error(f"Error appending to existing file {file_path}: {e}")
+            logger.error("Error appending to existing file %s: %s", file_path, e)
             logger.info("Falling back to overwrite mode")
 
     # Save to CSV
-    df.to_csv(file_path, index=False)
-    logger.info(f"Saved {len(df)} records to {file_path}")
+    _write_csv(df, file_path)
+    logger.info("Saved %d records to %s", len(df), file_path)
 
     return file_path
 
 
+def _to_parquet_table(df):
+    # Arrow table for the Parquet dataset. Object columns (e.g. tariff definitions, which may be
+    # dicts or strings) are always written as their string form, as the CSV writer does, so every
+    # batch appended to the dataset has the same schema; None if the frame cannot be converted.
+    object_columns = [col for col, dtype in df.dtypes.items() if dtype == object]
+    stringified = df.assign(**{col: df[col].astype(str).where(df[col].notna()) for col in object_columns})
+    try:
+        return pa.Table.from_pandas(stringified, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+
+
+def save_to_parquet(df, dataset_name, output_dir="data", partition_cols=("hourly_timestamp",)):
+    if df is None or df.empty:
+        logger.warning("No data to save to %s", dataset_name)
+        return None
+
+    if pa is None:
+        logger.warning("pyarrow is not installed, appending to CSV instead")
+        return save_to_csv(df, f"{dataset_name}.csv", output_dir, append=True)
+
+    table = _to_parquet_table(df)
+    if table is None:
+        logger.warning("Could not convert records for %s to Arrow, appending to CSV instead", dataset_name)
+        return save_to_csv(df, f"{dataset_name}.csv", output_dir, append=True)
+
+    dataset_path = os.path.join(output_dir, dataset_name)
+
+    # Each call adds one small file per partition instead of rewriting the history;
+    # file names sort by write time so duplicates can be dropped keeping the last on read
+    pa_ds.write_dataset(
+        table,
+        dataset_path,
+        format="parquet",
+        partitioning=list(partition_cols),
+        partitioning_flavor="hive",
+        basename_template=f"part-{time.time_ns()}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    logger.info("Appended %d records to %s", len(df), dataset_path)
+
+    return dataset_path
+
+
 def load_data(stations_path=None, utilization_path=None, hourly_path=None):
     stations_df = None
     utilization_df = None
@@ -68,36 +250,44 @@ def load_data(stations_path=None, utilization_path=None, hourly_path=None):
     if stations_path and os.path.exists(stations_path):
         try:
             stations_df = pd.read_csv(stations_path)
-            logger.info(f"Loaded {len(stations_df)} stations from {stations_path}")
+            stations_df = _drop_duplicate_keys(stations_df, ["id"])
+            logger.info("Loaded %d stations from %s", len(stations_df), stations_path)
         except Exception as e:
-            logger.error(f"Error loading stations data: {e}")
+            logger.error("Error loading stations data: %s", e)
 
     # Load utilization data
     if utilization_path and os.path.exists(utilization_path):
         try:
-            utilization_df = pd.read_csv(utilization_path)
+            if os.path.isdir(utilization_path):
+                # Partitioned Parquet dataset written by save_to_parquet
+                utilization_df = pd.read_parquet(utilization_path, engine="pyarrow")
 
-            # Convert timestamp columns to datetime
-            for col in ['timestamp', 'hourly_timestamp']:
-                if col in utilization_df.columns:
-                    utilization_df[col] = pd.to_datetime(utilization_df[col])
+                # Convert timestamp columns to datetime
+                for col in ['timestamp', 'hourly_timestamp']:
+                    if col in utilization_df.columns:
+                        values = utilization_df[col]
+                        # Partition columns come back dictionary-encoded
+                        if isinstance(values.dtype, pd.CategoricalDtype):
+                            values = values.astype(values.cat.categories.dtype)
+                        utilization_df[col] = pd.to_datetime(values, format='ISO8601')
+            else:
+                utilization_df = _read_csv_chunked(utilization_path, ['timestamp', 'hourly_timestamp'],
+                                                   _UTILIZATION_DTYPES)
+            utilization_df = _drop_duplicate_keys(utilization_df, ["timestamp", "connector_id"])
 
-            logger.info(f"Loaded {len(utilization_df)} utilization records from {utilization_path}")
+            logger.info("Loaded %d utilization records from %s", len(utilization_df), utilization_path)
         except Exception as e:
-            logger.error(f"Error loading utilization data: {e}")
+            logger.error("Error loading utilization data: %s", e)
 
     # Load hourly data
     if hourly_path and os.path.exists(hourly_path):
         try:
-            hourly_df = pd.read_csv(hourly_path)
-
-            # Convert timestamp column to datetime
-            if 'hourly_timestamp' in hourly_df.columns:
-                hourly_df['hourly_timestamp'] = pd.to_datetime(hourly_df['hourly_timestamp'])
+            hourly_df = _read_csv_chunked(hourly_path, ['hourly_timestamp'])
+            hourly_df = _drop_duplicate_keys(hourly_df, ["hourly_timestamp", "station_id"])
 
-            logger.info(f"Loaded {len(hourly_df)} hourly records from {hourly_path}")
+            logger.info("Loaded %d hourly records from %s", len(hourly_df), hourly_path)
         except Exception as e:
-            logger.error(f"Error loading hourly data: {e}")
+            logger.error("Error loading hourly data: %s", e)
 
     return stations_df, utilization_df, hourly_df
 
@@ -1,18 +1,19 @@
 import os
 import argparse
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import aiohttp
+
 # Import the pipeline modules
-from extract import extract_charging_stations
-from transform import transform_stations_data, transform_utilization_data, aggregate_hourly_utilization
+from extract import extract_charging_stations, extract_charging_stations_async
+from transform import flatten_connectors, transform_stations_data, transform_utilization_data, aggregate_hourly_utilization
 from load import save_to_csv
 from data_validation import validate_and_log_data
 from config import CONFIG
 
-# Set up logging
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
@@ -26,16 +27,24 @@ def run_single_extraction(output_dir=None):
     # Extract data
     stations_data = extract_charging_stations()
 
+    return process_stations_data(stations_data, output_dir)
+
+
+def process_stations_data(stations_data, output_dir):
+
     if not stations_data:
         logger.error("Extraction failed")
         return None, None, None
 
+    # Flatten the connectors once for both transforms
+    connectors_df = flatten_connectors(stations_data)
+
     # Transform stations data
-    stations_df = transform_stations_data(stations_data)
+    stations_df = transform_stations_data(stations_data, connectors_df)
 
     # Transform utilization data
     current_time = datetime.now()
-    utilization_df = transform_utilization_data(stations_data, current_time)
+    utilization_df = transform_utilization_data(stations_data, current_time, connectors_df)
 
     # Aggregate hourly data
     hourly_df = aggregate_hourly_utilization(utilization_df)
@@ -45,64 +54,103 @@ def run_single_extraction(output_dir=None):
     if not is_valid:
         logger.warning("Data validation found issues, but continuing with save operation")
 
-    # Save to CSV
-    save_to_csv(stations_df, CONFIG['csv']['stations_file'], output_dir)
-    save_to_csv(utilization_df, CONFIG['csv']['utilization_file'], output_dir)
-    save_to_csv(hourly_df, CONFIG['csv']['hourly_file'], output_dir)
+    # Save to CSV, writing the three files concurrently; the directory is created up front
+    # so the writers do not race on it
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = [
+        (stations_df, CONFIG['csv']['stations_file']),
+        (utilization_df, CONFIG['csv']['utilization_file']),
+        (hourly_df, CONFIG['csv']['hourly_file']),
+    ]
+    with ThreadPoolExecutor(max_workers=len(outputs)) as executor:
+        futures = [executor.submit(save_to_csv, df, filename, output_dir) for df, filename in outputs]
+        for future in futures:
+            future.result()
 
     logger.info("Single extraction completed successfully")
     return stations_df, utilization_df, hourly_df
 
 
-def run_continuous_extraction(duration_hours=24, interval_minutes=60, output_dir=None):
-
-    import time
-    from datetime import timedelta
+async def run_continuous_extraction(duration_hours=24, interval_minutes=60, output_dir=None):
 
     if output_dir is None:
         output_dir = CONFIG['csv']['output_dir']
 
-    logger.info(f"Starting continuous extraction for {duration_hours} hours with {interval_minutes} minute intervals")
+    logger.info("Starting continuous extraction for %s hours with %s minute intervals",
+                duration_hours, interval_minutes)
 
-    # Calculate end time
-    end_time = datetime.now() + timedelta(hours=duration_hours)
+    # Schedule on the loop's monotonic clock so wall-clock jumps cannot shift the cadence
+    loop = asyncio.get_running_loop()
+    interval_seconds = interval_minutes * 60
+    start_time = loop.time()
+    end_time = start_time + duration_hours * 3600
 
     # Initialize tracking variables
     extraction_count = 0
     success_count = 0
 
-    try:
-        while datetime.now() < end_time:
-            extraction_count += 1
-            logger.info(f"Extraction #{extraction_count} at {datetime.now().isoformat()}")
-
-            # Run a single extraction
-            stations_df, utilization_df, hourly_df = run_single_extraction(output_dir)
-
-            if stations_df is not None:
-                success_count += 1
+    # Pooled keep-alive connections shared by every extraction, and a cap on in-flight
+    # requests so additional endpoints can fan out over the same session
+    connector = aiohttp.TCPConnector(limit_per_host=CONFIG['api']['max_concurrent_requests'],
+                                     keepalive_timeout=300)
+    timeout = aiohttp.ClientTimeout(total=CONFIG['api']['timeout'])
+    semaphore = asyncio.Semaphore(CONFIG['api']['max_concurrent_requests'])
 
-            # Calculate time to next extraction
-            next_time = datetime.now() + timedelta(minutes=interval_minutes)
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            while loop.time() < end_time:
+                extraction_count += 1
+                logger.info("Extraction #%d at %s", extraction_count, datetime.now().isoformat())
+
+                # Run a single extraction
+                stations_data = await extract_charging_stations_async(
+                    session,
+                    url=CONFIG['api']['url'],
+                    max_retries=CONFIG['api']['max_retries'],
+                    retry_delay=CONFIG['api']['retry_delay'],
+                    semaphore=semaphore,
+                )
+                # Transforms and saves block, so they run in a worker thread off the event loop
+                stations_df, utilization_df, hourly_df = await asyncio.to_thread(
+                    process_stations_data, stations_data, output_dir)
 
-            # Sleep until next extraction time if not past end time
-            if next_time < end_time:
-                sleep_seconds = (next_time - datetime.now()).total_seconds()
+                if stations_df is not None:
+                    success_count += 1
+
+                # Next slot on the absolute schedule start + k * interval, so extraction time
+                # does not accumulate as drift; slots missed by a slow extraction are skipped
+                if interval_seconds <= 0:
+                    continue
+                next_slot = int((loop.time() - start_time) // interval_seconds) + 1
+                next_time = start_time + next_slot * interval_seconds
+
+                # Sleep until next extraction time if not past end time
+                if next_time >= end_time:
+                    break
+                sleep_seconds = next_time - loop.time()
                 if sleep_seconds > 0:
-                    logger.info(f"Sleeping for {sleep_seconds:.1f} seconds until next extraction")
-                    time.sleep(sleep_seconds)
+                    logger.info("Sleeping for %.1f seconds until next extraction", sleep_seconds)
+                    await asyncio.sleep(sleep_seconds)
 
     except KeyboardInterrupt:
         logger.info("Continuous extraction interrupted by user")
+    except asyncio.CancelledError:
+        # Let the cancellation reach the caller
+        logger.info("Continuous extraction cancelled after %d extractions", extraction_count)
+        raise
     except Exception as e:
-        logger.error(f"Error during continuous extraction: {e}")
+        logger.error("Error during continuous extraction: %s", e)
         return False
 
-    logger.info(f"Continuous extraction completed: {success_count}/{extraction_count} successful extractions")
+    logger.info("Continuous extraction completed: %d/%d successful extractions", success_count, extraction_count)
     return True
 
 
 def main():
+    # Set up logging once, for the whole pipeline
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="EV Charging Stations ETL pipeline")
     parser.add_argument("--single", action="store_true", help="Run a single extraction")
@@ -137,16 +185,20 @@ def main():
                 logger.info("Generating visualizations...")
                 map_path = create_map_visualization(stations_df, vis_dir)
                 if map_path:
-                    logger.info(f"Map visualization created: {map_path}")
+                    logger.info("Map visualization created: %s", map_path)
 
                 util_paths = create_utilization_visualizations(stations_df, utilization_df, hourly_df, vis_dir)
                 if util_paths:
-                    logger.info(f"Created {len(util_paths)} utilization visualizations")
+                    logger.info("Created %d utilization visualizations", len(util_paths))
             except Exception as e:
-                logger.error(f"Error creating visualizations: {e}")
+                logger.error("Error creating visualizations: %s", e)
     else:
         # Run continuous extraction
-        run_continuous_extraction(args.duration, args.interval, args.output_dir)
+        try:
+            asyncio.run(run_continuous_extraction(args.duration, args.interval, args.output_dir))
+        except KeyboardInterrupt:
+            # Already logged by run_continuous_extraction; still create visualizations below
+            pass
 
         # Create visualizations if requested
         if args.visualize:
@@ -166,15 +218,15 @@ def main():
                     logger.info("Generating visualizations...")
                     map_path = create_map_visualization(stations_df, vis_dir)
                     if map_path:
-                        logger.info(f"Map visualization created: {map_path}")
+                        logger.info("Map visualization created: %s", map_path)
 
                     util_paths = create_utilization_visualizations(stations_df, utilization_df, hourly_df, vis_dir)
                     if util_paths:
-                        logger.info(f"Created {len(util_paths)} utilization visualizations")
+                        logger.info("Created %d utilization visualizations", len(util_paths))
                 else:
                     logger.error("No data available for visualizations")
             except Exception as e:
-                logger.error(f"Error creating visualizations: {e}")
+                logger.error("Error creating visualizations: %s", e)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,12 @@
+import os
+
+# Directories already created by ensure_dir in this process
+_ENSURED = set()
+
+
+def ensure_dir(path):
+    # Create a directory once per process; later calls skip the filesystem entirely
+    if path in _ENSURED:
+        return
+    os.makedirs(path, exist_ok=True)
+    _ENSURED.add(path)
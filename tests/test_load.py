@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import load
+from transform import transform_utilization_data
+from data_validation import validate_utilization_data
+
+_UTILIZATION_CSV = """timestamp,hourly_timestamp,station_id,connector_id,connector_type,power,status,is_occupied,is_available,is_out_of_order,tariff
+2025-04-08T13:27:00,2025-04-08T13:00:00,1,a1,CCS,150.0,Occupied,1,0,0,
+2025-04-08T13:27:00,2025-04-08T13:00:00,1,a2,Type2,22.0,Available,,1,0,
+2025-04-08T13:27:00,2025-04-08T13:00:00,2,b1,CHAdeMO,50.0,OutOfOrder,0,0,1,
+"""
+
+
+def _stations(tariff):
+    connectors = [{'id': 'a1', 'type': 'CCS', 'status': 'AVAILABLE', 'effect': 150},
+                  {'id': 'a2', 'type': 'Type2', 'status': 'OCCUPIED', 'effect': 22}]
+    for connector in connectors:
+        connector['tariffDefinition'] = tariff
+    return [{'id': 1, 'name': 'Station A', 'status': 'AVAILABLE', 'location': {'lat': 60.39, 'lng': 5.32},
+             'connectors': connectors}]
+
+
+class LoadDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def test_blank_flag_loads_utilization_history(self):
+        path = os.path.join(self.output_dir, 'utilization_data.csv')
+        with open(path, 'w') as f:
+            f.write(_UTILIZATION_CSV)
+
+        _, utilization_df, _ = load.load_data(utilization_path=path)
+
+        self.assertIsNotNone(utilization_df)
+        self.assertEqual(len(utilization_df), 3)
+        self.assertEqual(str(utilization_df['is_occupied'].dtype), 'Int8')
+        self.assertEqual(utilization_df['is_occupied'].isna().tolist(), [False, True, False])
+        # A blank flag is missing, not a flag that contradicts the status
+
+        # The blank flag is the only record whose flags disagree with its status
+        _, issues, _ = validate_utilization_data(utilization_df)
+        self.assertEqual(issues, [])
+
+    def test_chunked_read_matches_single_read(self):
+        path = os.path.join(self.output_dir, 'utilization_data.csv')
+        with open(path, 'w') as f:
+            f.write(_UTILIZATION_CSV)
+
+        saved_chunk_rows = load._READ_CHUNK_ROWS
+        load._READ_CHUNK_ROWS = 1
+        try:
+            chunked = load._read_csv_chunked(path, ['timestamp', 'hourly_timestamp'], load._UTILIZATION_DTYPES)
+        finally:
+            load._READ_CHUNK_ROWS = saved_chunk_rows
+        whole = load._read_csv_chunked(path, ['timestamp', 'hourly_timestamp'], load._UTILIZATION_DTYPES)
+
+        pd.testing.assert_frame_equal(chunked, whole, check_categorical=False)
+        self.assertIsInstance(chunked['connector_type'].dtype, pd.CategoricalDtype)
+
+    @unittest.skipIf(load.pa is None, "pyarrow is not installed")
+    def test_parquet_round_trip_with_dict_then_string_tariffs(self):
+        dataset_name = 'utilization_data'
+        first = transform_utilization_data(_stations({'price': 3.5}), datetime(2025, 4, 8, 13, 5))
+        second = transform_utilization_data(_stations('standard'), datetime(2025, 4, 8, 14, 5))
+
+        load.save_to_parquet(first, dataset_name, self.output_dir)
+        load.save_to_parquet(second, dataset_name, self.output_dir)
+
+        _, utilization_df, _ = load.load_data(utilization_path=os.path.join(self.output_dir, dataset_name))
+
+        self.assertIsNotNone(utilization_df)
+        self.assertEqual(len(utilization_df), 4)
+        tariffs = utilization_df.sort_values(['timestamp', 'connector_id'])['tariff'].tolist()
+        self.assertEqual(tariffs, [str({'price': 3.5})] * 2 + ['standard'] * 2)
+
+    def test_appended_batches_share_one_csv_format(self):
+        first = transform_utilization_data(_stations('standard'), datetime(2025, 4, 8, 13, 5))
+        second = transform_utilization_data(_stations({'price': 3.5}), datetime(2025, 4, 8, 14, 5))
+
+        path = load.save_to_csv(first, 'utilization_data.csv', self.output_dir)
+        load.save_to_csv(second, 'utilization_data.csv', self.output_dir, append=True)
+
+        with open(path) as f:
+            rows = f.read().splitlines()[1:]
+        self.assertEqual([row.split(',')[:2] for row in rows],
+                         [['2025-04-08 13:05:00.000000', '2025-04-08 13:00:00.000000']] * 2 +
+                         [['2025-04-08 14:05:00.000000', '2025-04-08 14:00:00.000000']] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
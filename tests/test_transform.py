@@ -0,0 +1,33 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transform import transform_stations_data, transform_utilization_data
+
+
+def _stations():
+    return [
+        {'id': 1, 'name': 'Broken', 'status': 'AVAILABLE', 'connectionTypes': 'CCS'},
+        {'id': 2, 'name': 'Station B', 'status': 'AVAILABLE',
+         'connectionTypes': {'CCS': [{'id': 'b1', 'status': 'OCCUPIED', 'effect': 150}]}},
+    ]
+
+
+class MalformedStationTest(unittest.TestCase):
+
+    def test_malformed_connection_types_skip_only_that_station(self):
+        with self.assertLogs('transform', level='WARNING') as logs:
+            stations_df = transform_stations_data(_stations())
+            utilization_df = transform_utilization_data(_stations(), datetime(2025, 4, 8, 13, 27))
+
+        self.assertIn('Error processing station 1', logs.output[0])
+        self.assertEqual(stations_df['total_connectors'].tolist(), [0, 1])
+        self.assertEqual(utilization_df['connector_id'].tolist(), ['b1'])
+        self.assertEqual(utilization_df['station_id'].tolist(), [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
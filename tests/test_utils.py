@@ -0,0 +1,92 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import utils
+from config import CONFIG
+from transform import transform_stations_data, transform_utilization_data
+
+
+def _stations():
+    return [
+        {'id': 1, 'name': 'Station A', 'status': 'AVAILABLE', 'location': {'lat': 60.39, 'lng': 5.32},
+         'connectors': [{'id': 'a1', 'type': 'CCS', 'status': 'AVAILABLE', 'effect': 150},
+                        {'id': 'a2', 'type': 'Type2', 'status': 'OCCUPIED', 'effect': 22}]},
+        {'id': 2, 'name': 'Station B', 'status': 'AVAILABLE', 'location': {'lat': 59.91, 'lng': 10.75},
+         'connectors': [{'id': 'b1', 'type': 'CHAdeMO', 'status': 'OCCUPIED', 'effect': 50}]},
+    ]
+
+
+class SaveMetadataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self._saved_output_dir = CONFIG['csv']['output_dir']
+        CONFIG['csv']['output_dir'] = self.output_dir
+
+    def tearDown(self):
+        CONFIG['csv']['output_dir'] = self._saved_output_dir
+
+    def test_summary_statistics_round_trip(self):
+        stations_df = transform_stations_data(_stations())
+        utilization_df = transform_utilization_data(_stations(), datetime(2025, 4, 8, 13, 27))
+        stats = utils.calculate_summary_statistics(stations_df, utilization_df)
+
+        utils.save_metadata(stats, filename='summary.json')
+
+        with open(os.path.join(self.output_dir, 'summary.json')) as f:
+            saved = json.load(f)
+        self.assertEqual(saved['stations']['total'], 2)
+        self.assertEqual(saved['stations']['connector_types'], {'ccs': 1, 'chademo': 1, 'type2': 1})
+        self.assertEqual(saved['utilization']['total_records'], 3)
+        self.assertAlmostEqual(saved['utilization']['occupancy_rate'], 2 / 3)
+        self.assertEqual(saved['utilization']['status_counts'], {'Occupied': 2, 'Available': 1})
+
+    def test_numpy_scalars_are_serialized(self):
+        utils.save_metadata({'rate': np.float64(0.5), 'count': np.int64(3)}, filename='numpy.json')
+
+        with open(os.path.join(self.output_dir, 'numpy.json')) as f:
+            saved = json.load(f)
+        self.assertEqual(saved['rate'], 0.5)
+        self.assertEqual(saved['count'], 3)
+
+    def test_datetimes_are_serialized_as_iso_strings(self):
+        utils.save_metadata({'started': datetime(2025, 4, 8, 13, 27), 'day': date(2025, 4, 8)}, filename='dates.json')
+
+        with open(os.path.join(self.output_dir, 'dates.json')) as f:
+            saved = json.load(f)
+        self.assertEqual(saved['started'], '2025-04-08T13:27:00')
+        self.assertEqual(saved['day'], '2025-04-08')
+
+    def test_immediate_save_drops_queued_payload(self):
+        utils.save_metadata({'run': 'stale'}, filename='latest.json', flush_interval=0.05)
+        utils.save_metadata({'run': 'fresh'}, filename='latest.json')
+        time.sleep(0.2)
+
+        with open(os.path.join(self.output_dir, 'latest.json')) as f:
+            self.assertEqual(json.load(f)['run'], 'fresh')
+
+    def test_concurrent_saves_leave_no_temp_files(self):
+        threads = [threading.Thread(target=utils.save_metadata, args=({'run': i},), kwargs={'filename': 'race.json'})
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(os.listdir(self.output_dir), ['race.json'])
+        with open(os.path.join(self.output_dir, 'race.json')) as f:
+            self.assertIn(json.load(f)['run'], range(8))
+
+
+if __name__ == '__main__':
+    unittest.main()
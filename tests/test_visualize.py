@@ -0,0 +1,62 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import visualize
+
+_HOURLY_CSV = """hourly_timestamp,station_id,is_occupied
+2025-04-08 13:00:00,1,1
+2025-04-08 13:00:00,2,
+2025-04-08 14:00:00,1,0
+"""
+
+
+class CachedReadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.data_dir, visualize.HOURLY_FILE)
+        with open(self.csv_path, 'w') as f:
+            f.write(_HOURLY_CSV)
+
+    def test_sidecar_is_not_served_after_a_dtype_change(self):
+        first = visualize._cached_read(self.csv_path, dtypes={'is_occupied': 'float64'})
+        second = visualize._cached_read(self.csv_path, dtypes={'is_occupied': 'Int8'})
+
+        self.assertEqual(str(first['is_occupied'].dtype), 'float64')
+        self.assertEqual(str(second['is_occupied'].dtype), 'Int8')
+        self.assertEqual(len([name for name in os.listdir(self.data_dir) if name.endswith('.feather')]), 2)
+
+    def test_sidecar_is_reused_for_the_same_settings(self):
+        first = visualize._cached_read(self.csv_path, ('hourly_timestamp',), visualize.HOURLY_DTYPES)
+        second = visualize._cached_read(self.csv_path, ('hourly_timestamp',), visualize.HOURLY_DTYPES)
+
+        self.assertTrue(first.equals(second))
+        self.assertEqual(len([name for name in os.listdir(self.data_dir) if name.endswith('.feather')]), 1)
+
+
+class BusiestHoursTest(unittest.TestCase):
+
+    def test_streamed_totals_match_loaded_totals(self):
+        data_dir = tempfile.mkdtemp()
+        csv_path = os.path.join(data_dir, visualize.HOURLY_FILE)
+        with open(csv_path, 'w') as f:
+            f.write("hourly_timestamp,is_occupied\n"
+                    "2025-04-08 13:00:00,1\n2025-04-08 13:00:00,\n2025-04-08 13:00:00,3\n"
+                    "2025-04-08 14:00:00,0\nnot a date,1\n")
+
+        hourly_df = visualize.load_hourly_data(data_dir)
+        loaded = visualize._hour_totals(hourly_df['hourly_timestamp'].to_numpy('datetime64[h]'),
+                                        hourly_df['is_occupied'].to_numpy(float))
+        streamed = visualize.stream_busiest_hours(csv_path, chunksize=2)
+
+        self.assertEqual(streamed.tolist(), loaded.tolist())
+        self.assertEqual(streamed[13], 2)
+        self.assertEqual(streamed.sum(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
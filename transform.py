@@ -1,235 +1,249 @@
+import numpy as np
 import pandas as pd
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Normalized connector status -> flag code used to derive the is_* utilization columns
+_STATUS_TO_CODE = {'Available': 0, 'Occupied': 1, 'OutOfOrder': 2, 'UNAVAILABLE': 2}
+_FLAG_CODES = (('is_occupied', 1), ('is_available', 0), ('is_out_of_order', 2))
+
+# Enum-like utilization columns stored as categoricals
+_CATEGORICAL_COLUMNS = ('connector_type', 'status')
+
+# Raw API station status -> normalized status
+_STATUS_MAP = {
+    'AVAILABLE': 'Available',
+    'OCCUPIED': 'Occupied',
+    'UNAVAILABLE': 'OutOfOrder',
+    'OUT_OF_ORDER': 'OutOfOrder',
+    'PLANNED': 'Planned',
+    'UNDER_CONSTRUCTION': 'UnderConstruction'
+}
+
+# Raw API connector status -> normalized status
+_CONNECTOR_STATUS_MAPPING = {
+    'AVAILABLE': 'Available',
+    'OCCUPIED': 'Occupied',
+    'UNAVAILABLE': 'OutOfOrder',
+    'OUT_OF_ORDER': 'OutOfOrder'
+}
+
+# Connector fields read by the transforms, added as empty columns when the API omits them
+_CONNECTOR_FIELDS = ['id', 'type', 'power', 'effect', 'status', 'tariffDefinition']
+
+# Station fields read from the API payload
+_STATION_FIELDS = ['id', 'name', 'operator', 'status', 'address', 'description', 'location', 'totalConnectors',
+                   'amenities']
+
+# Connector types counted per station; anything else is counted as 'Other'
+_CONNECTOR_COUNT_KEYS = ('CCS', 'CHAdeMO', 'Type2', 'AC Type 2', 'Other')
+
+
+def _station_connectors(station):
+    # Use the processed connectors list if available, else the raw connection-type mapping
+    if 'connectors' in station and station['connectors']:
+        return station['connectors']
+
+    for field in ('connectionTypes', 'connectionsTypes'):
+        if field in station:
+            # A malformed mapping skips this station's connectors instead of failing the transform
+            connection_types = station[field]
+            if not isinstance(connection_types, dict) or not all(
+                    isinstance(conn_list, list) and all(isinstance(connector, dict) for connector in conn_list)
+                    for conn_list in connection_types.values()):
+                logger.warning("Error processing station %s: malformed %s", station.get('id', 'unknown'), field)
+                return []
 
-def transform_stations_data(stations_data):
-    logger.info("Transforming stations data")
+            connectors_list = []
+            for conn_type, conn_list in connection_types.items():
+                for connector in conn_list:
+                    connector['type'] = conn_type
+                    connectors_list.append(connector)
+            return connectors_list
 
-    if not stations_data:
-        logger.warning("No stations data to transform")
-        return pd.DataFrame()
+    return []
 
-    stations_table = []
 
-    for station in stations_data:
-        try:
-            # Initialize connector counts
-            connector_counts = {'CCS': 0, 'CHAdeMO': 0, 'Type2': 0, 'AC Type 2': 0, 'Other': 0}
-            total_connectors = 0
-            available_connectors = 0
+def flatten_connectors(stations_data):
+    # One row per connector tagged with its station's id and position in stations_data.
+    # Both transforms read this frame, so the JSON is walked once; max_level=0 keeps
+    # nested connector fields (e.g. tariff definitions) as single values
+    connectors_per_station = [_station_connectors(station) for station in stations_data]
+    connectors = [connector for connectors_list in connectors_per_station for connector in connectors_list]
+    connectors_df = pd.json_normalize(connectors, max_level=0)
+    connectors_df = connectors_df.reindex(
+        columns=connectors_df.columns.union(_CONNECTOR_FIELDS, sort=False))
 
-            # Process connectors
-            connectors_list = []
+    # Field defaults apply only when a connector lacks the key; explicit nulls stay null.
+    # power falls back to effect, and tariffDefinition defaults to ''
+    has_power = np.fromiter(('power' in connector for connector in connectors), dtype=bool, count=len(connectors))
+    has_tariff = np.fromiter(('tariffDefinition' in connector for connector in connectors), dtype=bool,
+                             count=len(connectors))
+    connectors_df['power'] = connectors_df['power'].where(has_power, connectors_df['effect'])
+    connectors_df['tariffDefinition'] = connectors_df['tariffDefinition'].astype(object).where(has_tariff, '')
+
+    lengths = np.fromiter(map(len, connectors_per_station), dtype=np.intp, count=len(connectors_per_station))
+    positions = np.repeat(np.arange(len(stations_data)), lengths)
+    station_ids = np.array([station.get('id') for station in stations_data], dtype=object)
+
+    connectors_df.insert(0, 'station_position', positions)
+    connectors_df.insert(1, 'station_id', station_ids[positions])
+    return connectors_df
+
+
+def _count_connectors(connectors_df, n_stations):
+    # Per-station connector counts by type (columns ordered as _CONNECTOR_COUNT_KEYS),
+    # number of available connectors and total connectors
+    positions = connectors_df['station_position'].to_numpy()
+
+    type_codes = pd.Categorical(connectors_df['type'], categories=_CONNECTOR_COUNT_KEYS[:-1]).codes.astype(np.intp)
+    type_codes[type_codes < 0] = len(_CONNECTOR_COUNT_KEYS) - 1
+    type_counts = np.bincount(positions * len(_CONNECTOR_COUNT_KEYS) + type_codes,
+                              minlength=n_stations * len(_CONNECTOR_COUNT_KEYS))
+
+    is_available = connectors_df['status'].astype('string').str.upper().eq('AVAILABLE').fillna(False)
+    available_counts = np.bincount(positions, weights=is_available.to_numpy(dtype=np.float64), minlength=n_stations)
 
+    connector_totals = np.bincount(positions, minlength=n_stations)
 
-            if 'connectors' in station and station['connectors']:
-                connectors_list = station['connectors']
-
-            elif 'connectionTypes' in station:
-                for conn_type, conn_list in station['connectionTypes'].items():
-                    for connector in conn_list:
-                        connector['type'] = conn_type
-                        connectors_list.append(connector)
-
-            elif 'connectionsTypes' in station:
-                for conn_type, conn_list in station['connectionsTypes'].items():
-                    for connector in conn_list:
-                        connector['type'] = conn_type
-                        connectors_list.append(connector)
-
-
-            if 'totalConnectors' in station and isinstance(station['totalConnectors'], (int, float)):
-                total_connectors = station['totalConnectors']
-
-            # Count connectors by type and count available connectors
-            for connector in connectors_list:
-                connector_type = connector.get('type')
-                if connector_type in connector_counts:
-                    connector_counts[connector_type] += 1
-                else:
-                    connector_counts['Other'] += 1
-
-                # Count available connectors for station status
-                connector_status = connector.get('status', '').upper()
-                if connector_status == 'AVAILABLE':
-                    available_connectors += 1
-
-                total_connectors = total_connectors or (len(connectors_list) if connectors_list else 0)
-
-            # Handle and normalize AC Type 2 as Type2
-            connector_counts['Type2'] += connector_counts['AC Type 2']
-
-            # Extract location information
-            location = station.get('location', {})
-            latitude = location.get('lat') if location else None
-            longitude = location.get('lng') if location else None
-
-            # Determine station status based on connector availability
-            if total_connectors == 0:
-                # Use original status if no connectors are defined
-                status = station.get('status')
-                if status and isinstance(status, str):
-                    status_mapping = {
-                        'AVAILABLE': 'Available',
-                        'OCCUPIED': 'Occupied',
-                        'UNAVAILABLE': 'OutOfOrder',
-                        'OUT_OF_ORDER': 'OutOfOrder',
-                        'PLANNED': 'Planned',
-                        'UNDER_CONSTRUCTION': 'UnderConstruction'
-                    }
-                    status = status_mapping.get(status.upper(), status)
-            else:
-                # Determine based on connector availability
-                if available_connectors > 0:
-                    status = 'Available'
-                elif available_connectors == 0 and total_connectors > 0:
-                    # If no connectors are available but station has connectors, mark as occupied
-                    status = 'Occupied'
-                else:
-                    # Default to using original status if we couldn't determine from connectors
-                    original_status = station.get('status', '')
-                    if isinstance(original_status, str) and original_status.upper() in ['UNAVAILABLE', 'OUT_OF_ORDER']:
-                        status = 'OutOfOrder'
-                    elif isinstance(original_status, str) and original_status.upper() in ['PLANNED']:
-                        status = 'Planned'
-                    elif isinstance(original_status, str) and original_status.upper() in ['UNDER_CONSTRUCTION']:
-                        status = 'UnderConstruction'
-                    else:
-                        status = 'Occupied'  # Default if we can't determine
-
-            # Create station record
-            station_record = {
-                'id': station.get('id'),
-                'name': station.get('name'),
-                'operator': station.get('operator', 'Eviny'),  # Default to Eviny based on API
-                'status': status,
-                'address': station.get('address'),
-                'description': station.get('description'),
-                'latitude': latitude,
-                'longitude': longitude,
-                'total_connectors': total_connectors,
-                'ccs_connectors': connector_counts['CCS'],
-                'chademo_connectors': connector_counts['CHAdeMO'],
-                'type2_connectors': connector_counts['Type2'] + connector_counts['AC Type 2'],
-                'other_connectors': connector_counts['Other'],
-                'amenities': ', '.join(station.get('amenities', [])) if station.get('amenities') else ''
-            }
-
-            stations_table.append(station_record)
-
-        except Exception as e:
-            logger.warning(f"Error processing station {station.get('id', 'unknown')}: {str(e)}")
-            continue
-
-    # Create DataFrame
-    stations_df = pd.DataFrame(stations_table)
+    return type_counts.reshape(n_stations, len(_CONNECTOR_COUNT_KEYS)), available_counts, connector_totals
+
+
+def transform_stations_data(stations_data, connectors_df=None):
+    logger.info("Transforming stations data")
+
+    if not stations_data:
+        logger.warning("No stations data to transform")
+        return pd.DataFrame()
+
+    if connectors_df is None:
+        connectors_df = flatten_connectors(stations_data)
+
+    # Count connectors per station in one vectorized pass
+    type_counts, available_counts, connector_totals = _count_connectors(connectors_df, len(stations_data))
+
+    stations = pd.DataFrame.from_records(stations_data, columns=_STATION_FIELDS)
+
+    # Handle and normalize AC Type 2 as Type2
+    connector_counts = pd.DataFrame(type_counts, columns=_CONNECTOR_COUNT_KEYS)
+    connector_counts['Type2'] += connector_counts['AC Type 2']
+
+    # Reported totals win; otherwise count the listed connectors
+    total_connectors = pd.to_numeric(stations['totalConnectors'], errors='coerce').fillna(0)
+    total_connectors = total_connectors.mask(total_connectors.eq(0), connector_totals)
+    if total_connectors.mod(1).eq(0).all():
+        total_connectors = total_connectors.astype(np.int64)
+
+    # Extract location information
+    locations = pd.DataFrame.from_records(
+        [location if isinstance(location, dict) else {} for location in stations['location']],
+        columns=['lat', 'lng'])
+
+    # Stations with connectors take their status from connector availability,
+    # the rest keep the normalized API status
+    raw_status = stations['status']
+    mapped_status = raw_status.astype('string').str.upper().map(_STATUS_MAP).astype(object).fillna(raw_status)
+    status = np.select(
+        [total_connectors.eq(0), available_counts > 0, total_connectors.gt(0),
+         mapped_status.isin(['OutOfOrder', 'Planned', 'UnderConstruction'])],
+        [mapped_status, 'Available', 'Occupied', mapped_status],
+        default='Occupied')
+
+    # Default to Eviny based on API, only for stations without an operator field; explicit nulls stay null
+    has_operator = np.fromiter(('operator' in station for station in stations_data), dtype=bool,
+                               count=len(stations_data))
+    operators = stations['operator'].astype(object).where(has_operator, 'Eviny')
+
+    stations_df = pd.DataFrame({
+        'id': stations['id'],
+        'name': stations['name'],
+        'operator': operators,
+        'status': status,
+        'address': stations['address'],
+        'description': stations['description'],
+        'latitude': pd.to_numeric(locations['lat'], errors='coerce'),
+        'longitude': pd.to_numeric(locations['lng'], errors='coerce'),
+        'total_connectors': total_connectors,
+        'ccs_connectors': connector_counts['CCS'],
+        'chademo_connectors': connector_counts['CHAdeMO'],
+        'type2_connectors': connector_counts['Type2'] + connector_counts['AC Type 2'],
+        'other_connectors': connector_counts['Other'],
+        'amenities': stations['amenities'].astype(object).str.join(', ').fillna('')
+    })
 
     # Data quality checks
-    if not stations_df.empty:
-        stations_with_no_coords = stations_df[stations_df['latitude'].isna() | stations_df['longitude'].isna()].shape[0]
-        stations_with_no_name = stations_df[stations_df['name'].isna()].shape[0]
+    stations_with_no_coords = int((stations_df['latitude'].isna() | stations_df['longitude'].isna()).sum())
+    stations_with_no_name = int(stations_df['name'].isna().sum())
 
-        if stations_with_no_coords > 0:
-            logger.warning(f"{stations_with_no_coords} stations missing coordinates")
+    if stations_with_no_coords > 0:
+        logger.warning("%d stations missing coordinates", stations_with_no_coords)
 
-        if stations_with_no_name > 0:
-            logger.warning(f"{stations_with_no_name} stations missing name")
+    if stations_with_no_name > 0:
+        logger.warning("%d stations missing name", stations_with_no_name)
 
-        # No NaN values in status column
-        stations_with_no_status = stations_df[stations_df['status'].isna()].shape[0]
-        if stations_with_no_status > 0:
-            logger.warning(f"{stations_with_no_status} stations have null status, setting to 'Unknown'")
-            stations_df['status'].fillna('Unknown', inplace=True)
+    # No NaN values in status column
+    stations_with_no_status = int(stations_df['status'].isna().sum())
+    if stations_with_no_status > 0:
+        logger.warning("%d stations have null status, setting to 'Unknown'", stations_with_no_status)
+        stations_df['status'].fillna('Unknown', inplace=True)
 
-    logger.info(f"Transformed {len(stations_df)} stations")
+    logger.info("Transformed %d stations", len(stations_df))
     return stations_df
 
 
-def transform_utilization_data(stations_data, timestamp):
+def transform_utilization_data(stations_data, timestamp, connectors_df=None):
     logger.info("Transforming utilization data")
 
     if not stations_data:
         logger.warning("No stations data to transform into utilization data")
         return pd.DataFrame()
 
-    utilization_records = []
-    timestamp_str = timestamp.isoformat()
-    hourly_timestamp = timestamp.replace(minute=0, second=0, microsecond=0).isoformat()
-
-    for station in stations_data:
-        try:
-            station_id = station.get('id')
+    # Stored as datetime64 scalars broadcast over the frame, so no per-row strings are built
+    # and downstream consumers need no to_datetime pass
+    extraction_time = pd.Timestamp(timestamp)
+    hourly_timestamp = extraction_time.floor('h')
 
-            # Process connectors
-            connectors_list = []
+    if connectors_df is None:
+        connectors_df = flatten_connectors(stations_data)
 
-            # Use the processed connectors list if available
-            if 'connectors' in station and station['connectors']:
-                connectors_list = station['connectors']
-            # Alternative field names
-            elif 'connectionTypes' in station:
-                for conn_type, conn_list in station['connectionTypes'].items():
-                    for connector in conn_list:
-                        connector['type'] = conn_type
-                        connectors_list.append(connector)
-            elif 'connectionsTypes' in station:
-                for conn_type, conn_list in station['connectionsTypes'].items():
-                    for connector in conn_list:
-                        connector['type'] = conn_type
-                        connectors_list.append(connector)
-
-            for connector in connectors_list:
-                connector_id = connector.get('id')
-                connector_type = connector.get('type')
-
-                # Handle different status field names and formats
-                connector_status = connector.get('status')
-                if connector_status and isinstance(connector_status, str):
-                    # Normalize status to our expected format
-                    status_mapping = {
-                        'AVAILABLE': 'Available',
-                        'OCCUPIED': 'Occupied',
-                        'UNAVAILABLE': 'OutOfOrder',
-                        'OUT_OF_ORDER': 'OutOfOrder'
-                    }
-                    connector_status = status_mapping.get(connector_status.upper(), connector_status)
-
-                # Extract power information (could be 'power' or 'effect')
-                power = connector.get('power', connector.get('effect'))
-
-                # Create utilization record
-                utilization_records.append({
-                    'timestamp': timestamp_str,
-                    'hourly_timestamp': hourly_timestamp,
-                    'station_id': station_id,
-                    'connector_id': connector_id,
-                    'connector_type': connector_type,
-                    'power': power,
-                    'status': connector_status,
-                    'is_occupied': 1 if connector_status == 'Occupied' else 0,
-                    'is_available': 1 if connector_status == 'Available' else 0,
-                    'is_out_of_order': 1 if connector_status in ('OutOfOrder', 'UNAVAILABLE') else 0,
-                    'tariff': connector.get('tariffDefinition', '')
-                })
-
-        except Exception as e:
-            logger.warning(f"Error processing utilization for station {station.get('id', 'unknown')}: {str(e)}")
-            continue
-
-    # Create DataFrame
-    utilization_df = pd.DataFrame(utilization_records)
+    if connectors_df.empty:
+        logger.info("Transformed 0 utilization records")
+        return pd.DataFrame()
 
-    # Data quality checks
-    if not utilization_df.empty:
+    # Normalize status to our expected format, leaving unknown values untouched
+    status = connectors_df['status']
+    status = status.astype('string').str.upper().map(_CONNECTOR_STATUS_MAPPING).astype(object).fillna(status)
+
+    # Derive the status flags from one code lookup per row
+    status_codes = status.map(_STATUS_TO_CODE).to_numpy(dtype=np.int8, na_value=-1)
+
+    columns = {
+        'timestamp': extraction_time,
+        'hourly_timestamp': hourly_timestamp,
+        'station_id': connectors_df['station_id'],
+        'connector_id': connectors_df['id'],
+        'connector_type': connectors_df['type'],
+        # Extract power information (could be 'power' or 'effect', resolved by flatten_connectors)
+        'power': connectors_df['power'],
+        'status': status,
+    }
+    for flag, code in _FLAG_CODES:
+        columns[flag] = (status_codes == code).astype(np.int8)
+    columns['tariff'] = connectors_df['tariffDefinition']
+
+    utilization_df = pd.DataFrame(columns, index=connectors_df.index)
+
+    # Low-cardinality labels are stored as categoricals (tariffs may be nested definitions, so stay as-is)
+    for column in _CATEGORICAL_COLUMNS:
+        utilization_df[column] = utilization_df[column].astype('category')
+
+    # Data quality checks, only counted when someone will see them
+    if logger.isEnabledFor(logging.DEBUG):
         status_counts = utilization_df['status'].value_counts()
-        logger.info(f"Utilization status counts: {status_counts.to_dict()}")
+        logger.debug("Utilization status counts: %s", status_counts.to_dict())
 
-    logger.info(f"Transformed {len(utilization_df)} utilization records")
+    logger.info("Transformed %d utilization records", len(utilization_df))
     return utilization_df
 
 
@@ -240,19 +254,18 @@ def aggregate_hourly_utilization(utilization_df):
         logger.warning("No utilization data to aggregate")
         return pd.DataFrame()
 
-    # Group by hourly timestamp and station ID
-    hourly_df = utilization_df.groupby(['hourly_timestamp', 'station_id']).agg({
-        'is_available': 'sum',
-        'is_occupied': 'sum',
-        'is_out_of_order': 'sum',
-        'connector_id': 'count'
-    }).reset_index()
+    # Group by hourly timestamp and station ID, hashing without sorting the keys
+    hourly_df = utilization_df.groupby(['hourly_timestamp', 'station_id'], sort=False, observed=True).agg(
+        is_available=('is_available', 'sum'),
+        is_occupied=('is_occupied', 'sum'),
+        is_out_of_order=('is_out_of_order', 'sum'),
+        total_connectors=('connector_id', 'count'),
+    ).reset_index()
 
-    # Rename and calculate additional metrics
-    hourly_df.rename(columns={'connector_id': 'total_connectors'}, inplace=True)
-    hourly_df['occupancy_rate'] = hourly_df['is_occupied'] / hourly_df['total_connectors']
-    hourly_df['availability_rate'] = hourly_df['is_available'] / hourly_df['total_connectors']
+    # Calculate additional metrics
+    hourly_df[['occupancy_rate', 'availability_rate']] = hourly_df[['is_occupied', 'is_available']].div(
+        hourly_df['total_connectors'], axis=0).to_numpy()
 
-    logger.info(f"Created {len(hourly_df)} hourly aggregated records")
+    logger.info("Created %d hourly aggregated records", len(hourly_df))
     return hourly_df
 
@@ -1,40 +1,103 @@
 
+import atexit
 import logging
 import os
-import json
-from datetime import datetime
-from logging.handlers import RotatingFileHandler
+import queue
+import tempfile
+import threading
+import pandas as pd
+from datetime import date, datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from config import CONFIG
+from paths import ensure_dir
+
+def _json_default(value):
+    # NumPy scalars (e.g. sums and rates from pandas reductions) become plain Python numbers;
+    # datetimes and dates become ISO strings, as orjson writes them natively
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+# orjson encodes metadata in C and handles datetimes natively; fall back if absent
+try:
+    import orjson
+
+    def _dumps(data):
+        return orjson.dumps(data, default=_json_default,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    import json
+
+    def _dumps(data):
+        return json.dumps(data, indent=2, default=_json_default).encode()
+
+# Formatters shared by every setup_logging call
+_FILE_FMT = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+_CONSOLE_FMT = logging.Formatter('%(levelname)s: %(message)s')
+
+# Level the handlers were last configured with
+_CURRENT_LEVEL = None
+
+# Background thread that writes queued log records to the file and console handlers
+_LISTENER = None
+
+# Metadata payloads waiting for the debounced writer, by file path
+_PENDING = {}
+_PENDING_LOCK = threading.Lock()
+_FLUSH_TIMER = None
+
+# Held while metadata files are written, so a stale flush never lands after a newer write
+_WRITE_LOCK = threading.Lock()
+
+# Fields every station and every connector must carry, in reporting order
+_REQUIRED = ('id', 'name', 'status')
+_CONN_FIELDS = ('id', 'status')
+_CONN_REQ = frozenset(_CONN_FIELDS)
+
+def _stop_log_listener():
+    # Drain queued records to their handlers, then release the log file
+    global _LISTENER
+    if _LISTENER is None:
+        return
+    _LISTENER.stop()
+    for handler in _LISTENER.handlers:
+        handler.close()
+    _LISTENER = None
+
+atexit.register(_stop_log_listener)
 
 def setup_logging(log_level=None):
+    global _CURRENT_LEVEL, _LISTENER
 
     if log_level is None:
         log_level = CONFIG['logging']['level']
     
     # Convert string log level to logging constant
-    numeric_level = getattr(logging, log_level.upper(), None)
+    numeric_level = logging.getLevelName(log_level.upper())
     if not isinstance(numeric_level, int):
         raise ValueError(f"Invalid log level: {log_level}")
     
+    # Already configured at this level; keep the open handlers
+    root_logger = logging.getLogger()
+    if _CURRENT_LEVEL == numeric_level and root_logger.handlers:
+        return
+    
     # Create log directory if it doesn't exist
-    log_dir = os.path.dirname(CONFIG['logging']['log_file'])
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    ensure_dir(os.path.dirname(CONFIG['logging']['log_file']))
     
     # Configure root logger
-    root_logger = logging.getLogger()
     root_logger.setLevel(numeric_level)
     
-    # Remove existing handlers to avoid duplicates
+    # Remove existing handlers to avoid duplicates, releasing their files
+    _stop_log_listener()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
-    
-    # Create formatters
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_formatter = logging.Formatter('%(levelname)s: %(message)s')
+        handler.close()
     
     # Create file handler with rotation
     file_handler = RotatingFileHandler(
@@ -43,20 +106,64 @@ def setup_logging(log_level=None):
         backupCount=CONFIG['logging']['backup_count']
     )
     file_handler.setLevel(numeric_level)
-    file_handler.setFormatter(file_formatter)
+    file_handler.setFormatter(_FILE_FMT)
     
     # Create console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(numeric_level)
-    console_handler.setFormatter(console_formatter)
+    console_handler.setFormatter(_CONSOLE_FMT)
     
-    # Add handlers to root logger
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    # Callers only enqueue records; the listener thread does the disk and console writes
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    _LISTENER = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _LISTENER.start()
+    _CURRENT_LEVEL = numeric_level
     
-    logging.info(f"Logging initialized with level {log_level}")
+    logging.info("Logging initialized with level %s", log_level)
+
+def _write_atomic(filepath, payload):
+    # Write to a uniquely named file beside the target and swap it in, so readers never see
+    # a truncated file and concurrent writers never share a temp file
+    directory, name = os.path.split(filepath)
+    with tempfile.NamedTemporaryFile('wb', dir=directory or '.', prefix=name + '.', suffix='.tmp',
+                                     delete=False) as f:
+        tmp_path = f.name
+        try:
+            f.write(payload)
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, filepath)
+
+def _flush_metadata():
+    # Write every pending metadata file once, keeping only the latest payload per path
+    global _FLUSH_TIMER
+    with _WRITE_LOCK:
+        with _PENDING_LOCK:
+            pending = dict(_PENDING)
+            _PENDING.clear()
+            _FLUSH_TIMER = None
+        
+        for filepath, payload in pending.items():
+            try:
+                _write_atomic(filepath, payload)
+                logging.info("Metadata saved to %s", filepath)
+            except Exception as e:
+                logging.error("Error saving metadata: %s", e)
+
+def _flush_metadata_at_exit():
+    # The daemon timer would otherwise race this flush; a write it already started finishes first
+    with _PENDING_LOCK:
+        if _FLUSH_TIMER is not None:
+            _FLUSH_TIMER.cancel()
+    _flush_metadata()
+
+atexit.register(_flush_metadata_at_exit)
 
-def save_metadata(data, filename='pipeline_metadata.json'):
+def save_metadata(data, filename='pipeline_metadata.json', flush_interval=None):
+    global _FLUSH_TIMER
 
     output_dir = CONFIG['csv']['output_dir']
     filepath = os.path.join(output_dir, filename)
@@ -67,24 +174,33 @@ def save_metadata(data, filename='pipeline_metadata.json'):
     
     try:
         # Create directory if it doesn't exist
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        ensure_dir(output_dir)
+        payload = _dumps(data)
         
-        # Write to file
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        logging.info(f"Metadata saved to {filepath}")
+        if flush_interval is None:
+            # Write to file, dropping any older payload still queued for it
+            with _WRITE_LOCK:
+                with _PENDING_LOCK:
+                    _PENDING.pop(filepath, None)
+                _write_atomic(filepath, payload)
+            logging.info("Metadata saved to %s", filepath)
+            return
     except Exception as e:
-        logging.error(f"Error saving metadata: {str(e)}")
+        logging.error("Error saving metadata: %s", e)
+        return
+    
+    # Debounced: updates within flush_interval seconds are coalesced into one write
+    with _PENDING_LOCK:
+        _PENDING[filepath] = payload
+        if _FLUSH_TIMER is None:
+            _FLUSH_TIMER = threading.Timer(flush_interval, _flush_metadata)
+            _FLUSH_TIMER.daemon = True
+            _FLUSH_TIMER.start()
 
 def validate_station_data(station):
 
-    # Required fields
-    required_fields = ['id', 'name', 'status']
-    
     # Check required fields
-    for field in required_fields:
+    for field in _REQUIRED:
         if field not in station or station[field] is None:
             return False, f"Missing required field: {field}"
     
@@ -120,14 +236,25 @@ def validate_station_data(station):
             if not isinstance(connector, dict):
                 return False, f"Connector {i} must be a dictionary"
             
-            if 'id' not in connector:
-                return False, f"Connector {i} missing id"
-            
-            if 'status' not in connector:
-                return False, f"Connector {i} missing status"
+            # One subset test covers both keys; name the first missing one on failure
+            if not _CONN_REQ.issubset(connector):
+                missing = next(field for field in _CONN_FIELDS if field not in connector)
+                return False, f"Connector {i} missing {missing}"
     
     return True, ""
 
+def _status_counts_and_sums(df, value_cols):
+    # Status counts and column totals from one grouping pass over the frame.
+    # Counts match value_counts (missing statuses excluded, most frequent first); totals cover every row.
+    if 'status' not in df.columns:
+        return None, df[value_cols].sum()
+    
+    grouped = df.groupby('status', dropna=False, observed=False, sort=False)
+    sizes = grouped.size()
+    sums = grouped[value_cols].sum().sum() if value_cols else pd.Series(dtype='int64')
+    status_counts = sizes[sizes.index.notna()].sort_values(ascending=False, kind='stable').to_dict()
+    return status_counts, sums
+
 def calculate_summary_statistics(stations_df, utilization_df):
 
     stats = {
@@ -146,27 +273,22 @@ def calculate_summary_statistics(stations_df, utilization_df):
     
     # Calculate station statistics
     if stations_df is not None and not stations_df.empty:
-        if 'status' in stations_df.columns:
-            status_counts = stations_df['status'].value_counts().to_dict()
+        connector_cols = [c for c in ('ccs_connectors', 'chademo_connectors', 'type2_connectors')
+                          if c in stations_df.columns]
+        status_counts, sums = _status_counts_and_sums(stations_df, connector_cols)
+        if status_counts is not None:
             stats['stations']['status_counts'] = status_counts
-        
-        # Count connector types
-        for connector_type in ['ccs_connectors', 'chademo_connectors', 'type2_connectors']:
-            if connector_type in stations_df.columns:
-                type_name = connector_type.replace('_connectors', '')
-                stats['stations']['connector_types'][type_name] = int(stations_df[connector_type].sum())
+        stats['stations']['connector_types'] = {k.replace('_connectors', ''): int(v) for k, v in sums.items()}
     
     # Calculate utilization statistics
     if utilization_df is not None and not utilization_df.empty:
-        if 'status' in utilization_df.columns:
-            status_counts = utilization_df['status'].value_counts().to_dict()
+        occupied_cols = ['is_occupied'] if 'is_occupied' in utilization_df.columns else []
+        status_counts, sums = _status_counts_and_sums(utilization_df, occupied_cols)
+        if status_counts is not None:
             stats['utilization']['status_counts'] = status_counts
         
-        # Calculate occupancy rate
-        if 'is_occupied' in utilization_df.columns:
-            total_connectors = len(utilization_df)
-            occupied_connectors = utilization_df['is_occupied'].sum()
-            if total_connectors > 0:
-                stats['utilization']['occupancy_rate'] = occupied_connectors / total_connectors
+        # Calculate occupancy rate (the frame is non-empty here)
+        if occupied_cols:
+            stats['utilization']['occupancy_rate'] = float(sums['is_occupied'] / len(utilization_df))
     
     return stats
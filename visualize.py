@@ -1,13 +1,38 @@
 import os
 import logging
 import argparse
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-import folium
-from folium.plugins import MarkerCluster
-import matplotlib.pyplot as plt
+import matplotlib
+from matplotlib.figure import Figure
 import seaborn as sns
 from datetime import datetime
 
+# paths depends only on os; utils would pull in config, which creates directories at import
+from paths import ensure_dir
+
+# orjson serializes the marker rows for the map in C; fall back if absent
+try:
+    import orjson
+
+    def _json_dumps(data):
+        return orjson.dumps(data).decode()
+except ImportError:
+    import json
+
+    def _json_dumps(data):
+        return json.dumps(data, separators=(",", ":"))
+
+# pyarrow's multi-threaded CSV reader when available, pandas' C parser otherwise
+try:
+    import pyarrow  # noqa: F401
+    _CSV_ENGINE = "pyarrow"
+except ImportError:
+    _CSV_ENGINE = "c"
+
 
 # Configuration Defaults
 
@@ -16,40 +41,221 @@ STATIONS_FILE = "charging_stations.csv"
 HOURLY_FILE = "utilization_data.csv"  # CSV containing hourly_timestamp and is_occupied columns
 OUTPUT_DIR = os.path.join("data", "visualizations")
 
+# Hourly files larger than this are aggregated chunk by chunk for the busiest hours chart
+STREAM_HOURLY_BYTES = 256 << 20
+STREAM_CHUNK_ROWS = 1_000_000
+
+# One Figure, cleared and reused by every chart. It is not managed by pyplot, so no GUI
+# backend is involved and savefig renders with Agg.
+_FIG = Figure()
+
+# Charts run concurrently with the map, so drawing and saving on the shared Figure is serialized
+_FIG_LOCK = threading.Lock()
+
+# Bump when _cached_read parses differently, so older Feather sidecars are no longer used
+_CACHE_VERSION = 1
+
+# Known column dtypes, applied at parse time instead of inferred
+STATIONS_DTYPES = {
+    "name": "str",
+    "status": "str",
+    "latitude": "float64",
+    "longitude": "float64",
+}
+# Small non-negative station counts, downcast after loading
+CONNECTOR_COUNT_COLUMNS = ['ccs_connectors', 'chademo_connectors', 'type2_connectors', 'other_connectors',
+                           'total_connectors']
+HOURLY_DTYPES = {
+    "connector_type": "category",
+    "status": "category",
+    # Nullable, so a row with an empty flag still parses
+    "is_occupied": "Int8",
+    "is_available": "Int8",
+    "is_out_of_order": "Int8",
+}
+
+# Standalone Leaflet page for the station map. Markers are built in the browser from
+# [lat, lon, popup, color] rows, so the page is a single string format however many stations there are.
+_MAP_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.css">
+<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/leaflet.markercluster/1.1.0/MarkerCluster.css">
+<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/leaflet.markercluster/1.1.0/MarkerCluster.Default.css">
+<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.css">
+<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/@fortawesome/fontawesome-free@6.2.0/css/all.min.css">
+<script src="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.js"></script>
+<script src="https://cdnjs.cloudflare.com/ajax/libs/leaflet.markercluster/1.1.0/leaflet.markercluster.js"></script>
+<script src="https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.js"></script>
+<style>html, body, #map {{ width: 100%; height: 100%; margin: 0; padding: 0; }}</style>
+</head>
+<body>
+<div id="map"></div>
+{legend_html}
+<script>
+var map = L.map("map").setView([{center_lat}, {center_lon}], {zoom_start});
+L.tileLayer("https://tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png", {{
+    maxZoom: 19,
+    attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
+}}).addTo(map);
+var cluster = L.markerClusterGroup();
+var data = {data_json};
+data.forEach(function (r) {{
+    var icon = L.AwesomeMarkers.icon({{icon: "bolt", prefix: "fa", markerColor: r[3]}});
+    L.marker([r[0], r[1]], {{icon: icon}}).bindPopup(r[2], {{maxWidth: 300}}).addTo(cluster);
+}});
+map.addLayer(cluster);
+</script>
+</body>
+</html>
+"""
+
+# Station popup: name, status, connector count, then the optional per-type and amenity lines
+_POPUP_FMT = "\n        <b>{}</b><br>\n        Status: {}<br>\n        Connectors: {}<br>\n        {}".format
+
+_LEGEND_HTML = """
+    <div style="position: fixed; bottom: 50px; left: 50px; z-index: 1000; background-color: white; padding: 10px; border: 2px solid grey; border-radius: 5px">
+    <p><strong>Station Status</strong></p>
+    <p><i class="fa fa-circle" style="color:green"></i> Available</p>
+    <p><i class="fa fa-circle" style="color:orange"></i> Occupied</p>
+    <p><i class="fa fa-circle" style="color:red"></i> Out of Order</p>
+    <p><i class="fa fa-circle" style="color:gray"></i> Planned</p>
+    <p><i class="fa fa-circle" style="color:blue"></i> Under Construction</p>
+    </div>
+    """
+
 
 
 # Data Loading Functions
+def _cached_read(csv_path, date_columns=(), dtypes=None):
+    # Read a CSV through a Feather sidecar that is rebuilt whenever the CSV is newer.
+    # Date columns are parsed before caching, so the sidecar keeps them as datetimes.
+    # The sidecar name carries a tag of the parse settings, so changing them never serves
+    # a sidecar parsed with the old dtypes.
+    tag = zlib.crc32(repr((_CACHE_VERSION, tuple(date_columns), sorted((dtypes or {}).items()))).encode())
+    feather_path = f"{csv_path}.{tag:08x}.feather"
+    if os.path.exists(feather_path) and os.path.getmtime(feather_path) >= os.path.getmtime(csv_path):
+        try:
+            return pd.read_feather(feather_path)
+        except Exception as e:
+            logging.warning("Ignoring unreadable cache %s: %s", feather_path, e)
+
+    # Dtypes and dates are handled by the parser, skipping type inference for known columns
+    header = pd.read_csv(csv_path, nrows=0).columns
+    date_columns = [col for col in date_columns if col in header]
+    df = pd.read_csv(csv_path, engine=_CSV_ENGINE, parse_dates=date_columns,
+                     dtype={col: dtype for col, dtype in (dtypes or {}).items() if col in header})
+
+    # Values the parser could not read as dates become NaT, as before
+    for col in date_columns:
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+
+    try:
+        df.to_feather(feather_path)
+    except Exception as e:
+        # Caching is best effort (pyarrow missing, read-only directory, ...)
+        logging.debug("Could not cache %s as Feather: %s", csv_path, e)
+    return df
+
+
 def load_stations_data(data_dir):
     stations_path = os.path.join(data_dir, STATIONS_FILE)
     if os.path.exists(stations_path):
-        df = pd.read_csv(stations_path)
-        logging.info(f"Loaded {len(df)} station records from {stations_path}")
+        df = _cached_read(stations_path, dtypes=STATIONS_DTYPES)
+
+        # Downcast so every later reduction moves fewer bytes; coordinates stay float64 for the map JSON
+        for col in CONNECTOR_COUNT_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], downcast='unsigned')
+        if 'status' in df.columns:
+            df['status'] = df['status'].astype('category')
+
+        logging.info("Loaded %d station records from %s", len(df), stations_path)
         return df
     else:
-        logging.error(f"Stations file not found: {stations_path}")
+        logging.error("Stations file not found: %s", stations_path)
         return None
 
 
+def _occupied_flags(values):
+    # is_occupied as a bool flag: a missing value counts as unoccupied, any non-zero as occupied.
+    # Loaded, in-memory and streamed data all go through this, so the charts agree.
+    return values.fillna(0).astype(bool)
+
+
 def load_hourly_data(data_dir):
     hourly_path = os.path.join(data_dir, HOURLY_FILE)
     if os.path.exists(hourly_path):
-        df = pd.read_csv(hourly_path)
-        logging.info(f"Loaded {len(df)} hourly records from {hourly_path}")
-        # Ensure hourly_timestamp is parsed as datetime
-        if "hourly_timestamp" in df.columns:
-            df["hourly_timestamp"] = pd.to_datetime(df["hourly_timestamp"], errors="coerce")
+        # hourly_timestamp is parsed as datetime once, then served from the cache
+        df = _cached_read(hourly_path, date_columns=("hourly_timestamp",), dtypes=HOURLY_DTYPES)
+        if "is_occupied" in df.columns:
+            df["is_occupied"] = _occupied_flags(df["is_occupied"])
+        logging.info("Loaded %d hourly records from %s", len(df), hourly_path)
         return df
     else:
-        logging.error(f"Hourly data file not found: {hourly_path}")
+        logging.error("Hourly data file not found: %s", hourly_path)
         return None
 
 
+def _hour_totals(timestamps, usage):
+    # Sum usage into 24 hour-of-day buckets from a datetime64[h] array; NaT rows are masked out.
+    # The hour is written straight into an int8 array (0-23 fits), never as a DataFrame column.
+    valid = ~np.isnat(timestamps)
+    hours = np.empty(int(valid.sum()), dtype=np.int8)
+    np.remainder(timestamps[valid].view(np.int64), 24, out=hours, casting="unsafe")
+    return np.bincount(hours.astype(np.intp), weights=usage[valid], minlength=24)
+
+
+def stream_busiest_hours(hourly_path, chunksize=STREAM_CHUNK_ROWS):
+    # Occupied connectors per hour of day, read in bounded chunks so memory stays constant
+    hour_totals = np.zeros(24, dtype=np.int64)
+    for chunk in pd.read_csv(hourly_path, usecols=["hourly_timestamp", "is_occupied"], chunksize=chunksize):
+        # Invalid timestamps become NaT and are dropped
+        timestamps = pd.to_datetime(chunk["hourly_timestamp"], format="ISO8601", errors="coerce")
+        hour_totals += _hour_totals(timestamps.to_numpy("datetime64[h]"),
+                                    _occupied_flags(chunk["is_occupied"]).to_numpy(np.float64)).astype(np.int64)
+    return hour_totals
+
+
+def _chart_axes(figsize):
+    # Reset the shared Figure to a blank single-axes chart of the given size,
+    # including any margins a previous tight_layout left behind
+    _FIG.clear()
+    _FIG.set_size_inches(figsize)
+    _FIG.subplots_adjust(**{side: matplotlib.rcParams[f"figure.subplot.{side}"]
+                            for side in ("left", "right", "bottom", "top")})
+    return _FIG.add_subplot(111)
+
+
+def _station_popups(map_data, status):
+    # Popup HTML for every station: one precompiled format call per row over plain column lists
+    names = map_data['name'].astype(str).fillna('').tolist()
+    totals = map_data['total_connectors'].astype(str).fillna('').tolist()
+
+    # Optional lines (connector types with a nonzero count, amenities), joined per row
+    extra_lines = []
+    for connector_type in ['ccs_connectors', 'chademo_connectors', 'type2_connectors']:
+        if connector_type in map_data.columns:
+            type_name = connector_type.replace('_connectors', '').upper()
+            extra_lines.append([f"{type_name}: {count}<br>" if count > 0 else ""
+                                for count in map_data[connector_type].tolist()])
+
+    if 'amenities' in map_data.columns:
+        extra_lines.append(["Amenities: " + amenities + "<br>" if amenities else ""
+                            for amenities in map_data['amenities'].fillna('').astype(str).tolist()])
+
+    extras = ["".join(lines) for lines in zip(*extra_lines)] if extra_lines else [""] * len(names)
+    return [_POPUP_FMT(*fields) for fields in zip(names, status.tolist(), totals, extras)]
+
+
 def create_map_visualization(stations_df, output_dir=None):
     if output_dir is None:
         output_dir = os.path.join(CONFIG['csv']['output_dir'], "visualizations")
 
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    ensure_dir(output_dir)
 
     if stations_df is None or len(stations_df) == 0:
         logging.warning("No station data available for map visualization")
@@ -68,12 +274,6 @@ def create_map_visualization(stations_df, output_dir=None):
     center_lat = map_data['latitude'].mean()
     center_lon = map_data['longitude'].mean()
 
-    # Create a map centered at the average coordinates
-    ev_map = folium.Map(location=[center_lat, center_lon], zoom_start=6)
-
-    # Add a marker cluster
-    marker_cluster = MarkerCluster().add_to(ev_map)
-
     # Status color mapping
     status_colors = {
         'Available': 'green',
@@ -83,61 +283,36 @@ def create_map_visualization(stations_df, output_dir=None):
         'UnderConstruction': 'blue'
     }
 
-    # Add markers for each station
-    for _, station in map_data.iterrows():
-        # Determine marker color based on status
-        status = station.get('status', 'Unknown')
-        color = status_colors.get(status, 'black')
-
-        # Create popup content
-        popup_content = f"""
-        <b>{station['name']}</b><br>
-        Status: {status}<br>
-        Connectors: {station['total_connectors']}<br>
-        """
-
-        # Add connector type info if available
-        for connector_type in ['ccs_connectors', 'chademo_connectors', 'type2_connectors']:
-            if connector_type in station and station[connector_type] > 0:
-                type_name = connector_type.replace('_connectors', '').upper()
-                popup_content += f"{type_name}: {station[connector_type]}<br>"
-
-        if 'amenities' in station and pd.notna(station['amenities']) and station['amenities']:
-            popup_content += f"Amenities: {station['amenities']}<br>"
-
-        # Add marker to the cluster
-        folium.Marker(
-            location=[station['latitude'], station['longitude']],
-            popup=folium.Popup(popup_content, max_width=300),
-            icon=folium.Icon(color=color, icon='bolt', prefix='fa')
-        ).add_to(marker_cluster)
-
-    # Add legend
-    legend_html = """
-    <div style="position: fixed; bottom: 50px; left: 50px; z-index: 1000; background-color: white; padding: 10px; border: 2px solid grey; border-radius: 5px">
-    <p><strong>Station Status</strong></p>
-    <p><i class="fa fa-circle" style="color:green"></i> Available</p>
-    <p><i class="fa fa-circle" style="color:orange"></i> Occupied</p>
-    <p><i class="fa fa-circle" style="color:red"></i> Out of Order</p>
-    <p><i class="fa fa-circle" style="color:gray"></i> Planned</p>
-    <p><i class="fa fa-circle" style="color:blue"></i> Under Construction</p>
-    </div>
-    """
-    ev_map.get_root().html.add_child(folium.Element(legend_html))
+    # Known statuses index into the color array; unknown or missing ones get code -1, the trailing 'black'
+    color_arr = np.array(list(status_colors.values()) + ['black'])
+
+    # Build every popup and marker color column-wise
+    if 'status' in map_data.columns:
+        status = map_data['status'].astype(str).where(map_data['status'].notna(), 'Unknown')
+    else:
+        status = pd.Series('Unknown', index=map_data.index)
+    markers = map_data[['latitude', 'longitude']].assign(
+        popup=_station_popups(map_data, status),
+        color=color_arr[pd.Categorical(status, categories=list(status_colors)).codes],
+    )
+
+    # Embed the rows as JSON; "</" is escaped so popup text can never close the script block
+    data_json = _json_dumps(markers.values.tolist()).replace("</", "<\\/")
 
-    # Save map to HTML file
+    # Save map to HTML file, centered at the average coordinates
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     map_filename = f"charging_stations_map_{timestamp}.html"
     map_path = os.path.join(output_dir, map_filename)
-    ev_map.save(map_path)
+    with open(map_path, "w", encoding="utf-8") as f:
+        f.write(_MAP_TEMPLATE.format(legend_html=_LEGEND_HTML, center_lat=center_lat, center_lon=center_lon,
+                                     zoom_start=6, data_json=data_json))
 
-    logging.info(f"Map visualization saved to {map_path}")
+    logging.info("Map visualization saved to %s", map_path)
     return map_path
 
 
 def create_connector_type_distribution(stations_df, output_dir):
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    ensure_dir(output_dir)
 
     # Define the expected connector columns
     connector_columns = ['ccs_connectors', 'chademo_connectors', 'type2_connectors']
@@ -156,25 +331,24 @@ def create_connector_type_distribution(stations_df, output_dir):
         logging.warning("No connector data found (all counts are zero)")
         return None
 
-    plt.figure(figsize=(8, 8))
-    plt.pie(connector_data.values(), labels=connector_data.keys(), autopct='%1.1f%%',
-            startangle=90, colors=sns.color_palette("Set2", len(connector_data)))
-    plt.axis('equal')
-    plt.title('Connector Type Distribution', fontsize=14)
-
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     pie_filename = f"connector_type_distribution_{timestamp}.png"
     pie_path = os.path.join(output_dir, pie_filename)
-    plt.savefig(pie_path)
-    plt.close()
-    logging.info(f"Connector type distribution pie chart saved to {pie_path}")
+
+    with _FIG_LOCK:
+        ax = _chart_axes((8, 8))
+        ax.pie(connector_data.values(), labels=connector_data.keys(), autopct='%1.1f%%',
+               startangle=90, colors=sns.color_palette("Set2", len(connector_data)))
+        ax.axis('equal')
+        ax.set_title('Connector Type Distribution', fontsize=14)
+        _FIG.savefig(pie_path)
+    logging.info("Connector type distribution pie chart saved to %s", pie_path)
     return pie_path
 
 
 def create_busiest_hours_chart(hourly_df, output_dir):
 
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    ensure_dir(output_dir)
 
     if hourly_df is None or hourly_df.empty:
         logging.warning("No hourly data available for busiest hours chart")
@@ -184,35 +358,49 @@ def create_busiest_hours_chart(hourly_df, output_dir):
         logging.warning("Column 'hourly_timestamp' not found in hourly data")
         return None
 
-    # Drop rows with invalid timestamps
-    hourly_df = hourly_df.dropna(subset=["hourly_timestamp"])
-    # Extract the hour from the timestamp
-    hourly_df["hour"] = hourly_df["hourly_timestamp"].dt.hour
-
     # Use 'is_occupied' column for occupancy count
     usage_col = "is_occupied"
     if usage_col not in hourly_df.columns:
-        logging.warning(f"Column '{usage_col}' not found in hourly data")
+        logging.warning("Column '%s' not found in hourly data", usage_col)
         return None
 
-    # Group by hour and sum the usage/occupancy
-    hour_usage = hourly_df.groupby("hour")[usage_col].sum().reset_index()
-    hour_usage.sort_values("hour", inplace=True)
+    # Sum the usage/occupancy into 24 hour-of-day buckets; the key domain is fixed, so no grouping is needed.
+    # Invalid timestamps are masked on the NumPy views, leaving the input frame untouched.
+    hour_totals = _hour_totals(hourly_df["hourly_timestamp"].to_numpy("datetime64[h]"),
+                               _occupied_flags(hourly_df[usage_col]).to_numpy(np.float64))
+
+    return _plot_busiest_hours(range(24), hour_totals, output_dir)
+
+
+def create_busiest_hours_chart_streaming(hourly_path, output_dir):
+    # Same chart for hourly files too large to load, aggregated while reading
+    ensure_dir(output_dir)
 
-    plt.figure(figsize=(10, 6))
-    plt.bar(hour_usage["hour"], hour_usage[usage_col], color="#1f77b4")
-    plt.title("Busiest Hours for Charging Stations", fontsize=14)
-    plt.xlabel("Hour of Day (0-23)", fontsize=12)
-    plt.ylabel("Total Occupied Connectors / Sessions", fontsize=12)
-    plt.xticks(range(24))
-    plt.tight_layout()
+    header = pd.read_csv(hourly_path, nrows=0).columns
+    for col in ("hourly_timestamp", "is_occupied"):
+        if col not in header:
+            logging.warning("Column '%s' not found in hourly data", col)
+            return None
 
+    hour_totals = stream_busiest_hours(hourly_path)
+    return _plot_busiest_hours(range(24), hour_totals, output_dir)
+
+
+def _plot_busiest_hours(hours, totals, output_dir):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     chart_filename = f"busiest_hours_{timestamp}.png"
     chart_path = os.path.join(output_dir, chart_filename)
-    plt.savefig(chart_path)
-    plt.close()
-    logging.info(f"Busiest hours chart saved to {chart_path}")
+
+    with _FIG_LOCK:
+        ax = _chart_axes((10, 6))
+        ax.bar(hours, totals, color="#1f77b4")
+        ax.set_title("Busiest Hours for Charging Stations", fontsize=14)
+        ax.set_xlabel("Hour of Day (0-23)", fontsize=12)
+        ax.set_ylabel("Total Occupied Connectors / Sessions", fontsize=12)
+        ax.set_xticks(range(24))
+        _FIG.tight_layout()
+        _FIG.savefig(chart_path)
+    logging.info("Busiest hours chart saved to %s", chart_path)
     return chart_path
 
 
@@ -235,30 +423,33 @@ def main():
 
     # Load data
     stations_df = load_stations_data(args.data_dir)
-    hourly_df = load_hourly_data(args.data_dir)
+
+    # Very large hourly histories are streamed by the busiest hours chart instead of loaded
+    hourly_path = os.path.join(args.data_dir, HOURLY_FILE)
+    stream_hourly = os.path.exists(hourly_path) and os.path.getsize(hourly_path) > STREAM_HOURLY_BYTES
+    hourly_df = None if stream_hourly else load_hourly_data(args.data_dir)
 
     if stations_df is None:
         logging.error("No stations data loaded. Exiting.")
         return 1
 
-    # Create visualizations
-    saved_files = []
-
-    map_path = create_map_visualization(stations_df, args.output_dir)
-    if map_path:
-        saved_files.append(map_path)
-
-    pie_path = create_connector_type_distribution(stations_df, args.output_dir)
-    if pie_path:
-        saved_files.append(pie_path)
+    # Create visualizations concurrently; the map overlaps the charts, which take turns on the shared Figure
+    if stream_hourly:
+        busiest_chart = (create_busiest_hours_chart_streaming, hourly_path, args.output_dir)
+    else:
+        busiest_chart = (create_busiest_hours_chart, hourly_df, args.output_dir)
 
-    busiest_path = create_busiest_hours_chart(hourly_df, args.output_dir)
-    if busiest_path:
-        saved_files.append(busiest_path)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(create_map_visualization, stations_df, args.output_dir),
+            executor.submit(create_connector_type_distribution, stations_df, args.output_dir),
+            executor.submit(*busiest_chart),
+        ]
+        saved_files = [path for path in (future.result() for future in futures) if path]
 
     logging.info("Visualizations generated:")
     for path in saved_files:
-        logging.info(f"- {path}")
+        logging.info("- %s", path)
 
     return 0
 